@@ -1,4 +1,3 @@
-import json
 from typing import Annotated, Any, List, Optional, TypedDict
 from fastapi import Depends, HTTPException
 from langchain_openai import ChatOpenAI
@@ -6,9 +5,12 @@ from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
 from langgraph.graph.graph import CompiledGraph
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain_core.runnables.config import RunnableConfig
-from core.common import get_gpt_client
+from core.checkpointer import BoundedMemorySaver
+from core.compaction import TABLE_FORMAT_NOTE, compact_dataset
+from core.common import get_gpt_client, get_graph_registry
+from core.graph_registry import GraphRegistry
+from core.retrieval import relevant_data
 
 
 class ComponentRequestSchema(BaseModel):
@@ -83,16 +85,23 @@ DEFAULT_COMPONENTS = [
 class ComponentAgent:
     """Agent for generating UI components."""
 
-    def __init__(self, client: Annotated[ChatOpenAI, Depends(get_gpt_client)]):
+    def __init__(
+        self,
+        client: Annotated[ChatOpenAI, Depends(get_gpt_client)],
+        graphs: Annotated[GraphRegistry, Depends(get_graph_registry)],
+    ):
         self.client = client
-        self.checkpoint_saver = InMemorySaver()
-        self.graph = self._build_graph()
+        self.graph = graphs.get("component", self._build_graph)
+        self.checkpoint_saver = self.graph.checkpointer
 
     def _build_graph(self) -> CompiledGraph:
         """Build the langgraph workflow for component generation"""
 
         # Initialize the graph
         graph = StateGraph(AgentState)
+        structured_output_model = self.client.with_structured_output(
+            ComponentResponseSchema
+        )
 
         async def analyze_data(state: AgentState):
             """1. Node of Component Agent Graph
@@ -106,13 +115,14 @@ class ComponentAgent:
                     Return only the extracted information, without any extra text or explanations.
                     Analyze the provided data and question carefully.
                     Provide a clear rationale for your choices.
+                    {TABLE_FORMAT_NOTE}
                     """
                 ),
                 HumanMessage(
                     f"""
                              Question: {state["question"]}
                              
-                             The provided data: {state["data"]}
+                             The provided data: {relevant_data(state["data"], state["question"])}
                              """
                 ),
             ]
@@ -161,9 +171,6 @@ class ComponentAgent:
 
             Generate final response component.
             """
-            structured_output_model = self.client.with_structured_output(
-                ComponentResponseSchema
-            )
             messages = [
                 SystemMessage(
                     f"""You are a specialized front end developer. Your task is to create one React component 
@@ -197,19 +204,21 @@ class ComponentAgent:
         graph.add_edge("component_plan", "generate")
         graph.add_edge("generate", END)
 
-        return graph.compile(checkpointer=self.checkpoint_saver)
+        return graph.compile(
+            checkpointer=BoundedMemorySaver.from_env(allowed_types=(Component, ComponentResponseSchema))
+        )
 
     async def generate_ui_component(
-        self, question: str, data: Any | dict
+        self, question: str, data: Any | dict, session_id: str
     ) -> ComponentResponseSchema:
         """Generate UI component based on the user's question and the data."""
 
         initial_state: AgentState = {
             "question": question,
-            "data": json.dumps(data),
+            "data": compact_dataset(data, "component"),
             "components": DEFAULT_COMPONENTS,
         }
-        config = RunnableConfig(configurable={"thread_id": "1"})
+        config = RunnableConfig(configurable={"thread_id": session_id})
 
         result = await self.graph.ainvoke(initial_state, config=config)
 
@@ -2,76 +2,94 @@ from typing import Annotated, List, Optional, TypedDict, Union
 from fastapi import Depends
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 from langchain_core.messages import SystemMessage, HumanMessage
-from core.common import get_gpt_client
-from schemas.dashboard_schema import AgentState, Layout, LayoutNode
+from core.checkpointer import BoundedMemorySaver
+from core.compaction import TABLE_FORMAT_NOTE, compact_dataset
+from core.common import get_gpt_client, get_graph_registry
+from core.graph_registry import GraphRegistry
+from core.retrieval import relevant_data
+from schemas.dashboard_schema import AgentState, Layout
+
+# Number of layouts generated for the user to choose from
+LAYOUT_COUNT = 3
+
+# Approach of each layout, so the separately generated layouts differ in their
+# information hierarchy, visualization method and interaction pattern
+LAYOUT_APPROACHES = (
+    "An overview. KPI boxes and summary cards first, then the details in a grid.",
+    "An analytical view. Charts and tables side by side, emphasizing trends and comparisons, with filtering.",
+    "A narrative. A hero section followed by sections, lists, timelines and accordions to drill down.",
+)
 
 
 class DashboardAgent:
     """Agent for generating dashboard layouts."""
 
-    def __init__(self, client: Annotated[ChatOpenAI, Depends(get_gpt_client)]) -> None:
+    def __init__(
+        self,
+        client: Annotated[ChatOpenAI, Depends(get_gpt_client)],
+        graphs: Annotated[GraphRegistry, Depends(get_graph_registry)],
+    ) -> None:
         self.client = client
-        self.checkpoint_saver = InMemorySaver()
-        self.graph = self._build_graph()
+        self.graph = graphs.get("dashboard", self._build_graph)
+        self.checkpoint_saver = self.graph.checkpointer
 
     def _build_graph(self):
         graph = StateGraph(AgentState)
+        layout_model = self.client.with_structured_output(Layout)
+        final_model = self.client.with_structured_output(Layout)
 
-        async def generate_layouts(state: AgentState):
-            """Generate three layouts from the data."""
-            structured_model = self.client.with_structured_output(LayoutNode)
+        async def generate_layout(state: AgentState):
+            """Generate one of the layouts, with the approach of its index."""
+            index = state["layout_index"]
             messages = [
                 SystemMessage(
-                    """You are a UI layout designer expert. Generate 3 distinct layout approaches for the provided data and user request. Focus on:
+                    f"""You are a UI layout designer expert. Generate a dashboard layout for the provided data and user request. It is layout {index + 1} of {LAYOUT_COUNT}, which are generated separately, so follow its approach to make it distinct from the others:
 
-                        1. **Layout Structure**: Different ways to organize the information
-                        2. **Visualization Approach**: Different chart types, table vs cards, etc.
-                        3. **User Experience**: Different interaction patterns
+                        **Approach:** {LAYOUT_APPROACHES[index % len(LAYOUT_APPROACHES)]}
 
-                        For each layout, provide:
-                        - A unique layout_id, with this format: layout-[number]
+                        Focus on:
+                        1. **Layout Structure**: How the approach organizes the information
+                        2. **Visualization Approach**: Chart types, table vs cards, etc.
+                        3. **User Experience**: The interaction pattern of the approach
+
+                        Provide:
+                        - The layout_id: layout-{index + 1}
                         - A descriptive page_title about the content of the dashboard
-                        - Simplified HTML structure with distinct layout approaches, build different flexbox or grid for each layout 
+                        - Simplified HTML structure, with a flexbox or grid which fits the approach
                         - Basic CSS for the components, use white as the background of the components and grey for the borders. The borders must have 12px border radius. The dashboard layout must be middle centered and responsive.
+                        - An empty js
 
                         Important: Watch out for these specifically — do NOT skip them.
                         - Use every information in the provided data.
                         - Use flexbox, grid or both.
                         - Do not create navigation components within the page.
-                        - Watch out for the layout_id format.
                         - Page title should be describe the content of the page. No technicalities.
                         - The data and informations must be hardcoded into the html elements.
-
-                        Make each layout distinctly different in approach."""
+                        - {TABLE_FORMAT_NOTE}"""
                 ),
                 HumanMessage(
-                    f"""Generate 3 different layout options for:
+                    f"""Generate the layout for:
 
                         **USER REQUEST:** {state['query']}
                         **DATA:** {state['data']}
 
-                        Create layouts that differ in:
-                        1. Information hierarchy (what's emphasized)
-                        2. Visualization method with flexbox, grid or both. (charts,tables,cards,buttons, kpi boxes, hero section, accordions, alerts, box groups, lists, dropdowns, timelines, paragraphs, texts, numbers, decreasing and increasing numbers)
-                        3. User interaction patterns (drilling down vs filtering vs overview)
-                        
+                        Visualization methods to choose from, with flexbox, grid or both: charts, tables, cards, buttons, kpi boxes, hero section, accordions, alerts, box groups, lists, dropdowns, timelines, paragraphs, texts, numbers, decreasing and increasing numbers.
+
                         Keep the HTML simple - focus on structure, not final styling."""
                 ),
             ]
 
-            response = await structured_model.ainvoke(messages)
-
-            state["layouts"] = response.layouts
-            return state
+            layout = await layout_model.ainvoke(messages)
+            layout.layout_id = f"layout-{index + 1}"
+            return {"layouts": [layout]}
 
         async def finalize_dashboard(
             state: AgentState,
         ) -> AgentState:
             """Finalize user decided dashboard layout."""
-            structured_model = self.client.with_structured_output(Layout)
 
             messages = [
                 SystemMessage(
@@ -93,6 +111,7 @@ class DashboardAgent:
                         - Ensure generated HTML structure is compatible with the provided CSS classes and selectors
                         - Extend the provided styles with additional CSS as needed for data visualization
                         - Maintain consistency with the established design system
+                        - The design system stylesheet is already linked in the page, do NOT repeat its rules in your CSS
 
                         ## TECHNICAL REQUIREMENTS:
 
@@ -105,6 +124,7 @@ class DashboardAgent:
 
                         ### CSS GENERATION:
                         - Build upon the provided CSS descriptor styles
+                        - Return ONLY the component-specific CSS which is not already in the design system
                         - Add data-specific styling (charts, tables, cards, etc.)
                         - Implement responsive behavior that complements the base styles
                         - Create smooth transitions and hover effects
@@ -144,49 +164,58 @@ class DashboardAgent:
 
                         **SELECTED LAYOUT:** {state['selected_layout']}
                         **UI DESCRIPTORS:** {state['ui_descriptor']}
-                        **CSS Styles:** {state['design_system']}
+                        **CSS Styles (design system, already linked in the page):** {state['design_system']}
 
                         Generate a single, complete dashboard based on the selected layout.
                         
                         Important:
                         - Use the CSS for styling.
+                        - Return only the CSS additions for this dashboard, not the design system itself.
                         - Use the same flexbox/grid structure of the selected layout.
                         - Hardcode the informations in the HTML.
                         """
                 ),
             ]
 
-            response = await structured_model.ainvoke(messages)
+            response = await final_model.ainvoke(messages)
 
-            state["final"] = response
-            return state
+            # Only the update, the layouts of the state would be collected again
+            return {"final": response}
 
         def route_phase_node(state: AgentState) -> AgentState:
             # This node just passes through the state
-            return state
+            return {}
 
-        def route_phase_condition(state: AgentState) -> str:
-            # This function determines which path to take
+        def route_phase_condition(state: AgentState) -> Union[str, List[Send]]:
+            # The layouts are generated by concurrent calls, one per layout
             if state["phase"] == "layout":
-                return "layout"
+                data = relevant_data(
+                    compact_dataset(state["data"], "dashboard"), state["query"]
+                )
+                return [
+                    Send(
+                        "generate_layout",
+                        {"query": state["query"], "data": data, "layout_index": i},
+                    )
+                    for i in range(LAYOUT_COUNT)
+                ]
             else:
-                return "final"
+                return "finalize_dashboard"
 
         graph.add_node("route_phase", route_phase_node)
-        graph.add_node("generate_layouts", generate_layouts)
+        graph.add_node("generate_layout", generate_layout)
         graph.add_node("finalize_dashboard", finalize_dashboard)
 
         graph.set_entry_point("route_phase")
         graph.add_conditional_edges(
             "route_phase",
             route_phase_condition,
-            {
-                "layout": "generate_layouts",
-                "final": "finalize_dashboard",
-            },
+            ["generate_layout", "finalize_dashboard"],
         )
 
-        graph.add_edge("generate_layouts", END)
+        graph.add_edge("generate_layout", END)
         graph.add_edge("finalize_dashboard", END)
 
-        return graph.compile(checkpointer=self.checkpoint_saver)
+        return graph.compile(
+            checkpointer=BoundedMemorySaver.from_env(allowed_types=(Layout,))
+        )
@@ -1,12 +1,15 @@
-from typing import Annotated, TypedDict
+from typing import Annotated, AsyncIterator, Optional, TypedDict
 from fastapi import Depends, HTTPException
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.runnables.config import RunnableConfig
-from core.common import get_gpt_client
+from core.checkpointer import BoundedMemorySaver
+from core.compaction import compact_dataset
+from core.common import get_gpt_client, get_graph_registry
+from core.graph_registry import GraphRegistry
+from core.sse import Event, GraphRun
 
 
 class IframeComponentResponseSchema(BaseModel):
@@ -21,6 +24,7 @@ class IframeComponentRequestSchema(BaseModel):
 
     question: str
     data: str
+    dataset_id: Optional[str] = None
 
 
 class AgentResponseSchema(BaseModel):
@@ -45,16 +49,22 @@ class AgentState(TypedDict):
 class IframeComponentAgent:
     """Agent for generating Iframe components."""
 
-    def __init__(self, client: Annotated[ChatOpenAI, Depends(get_gpt_client)]):
+    def __init__(
+        self,
+        client: Annotated[ChatOpenAI, Depends(get_gpt_client)],
+        graphs: Annotated[GraphRegistry, Depends(get_graph_registry)],
+    ):
         self.client = client
-        self.checkpoint_saver = InMemorySaver()
-        self.graph = self._build_graph()
+        self.graph = graphs.get("iframe_component", self._build_graph)
+        self.checkpoint_saver = self.graph.checkpointer
 
     def _build_graph(self):
         graph = StateGraph(AgentState)
+        structured_model = self.client.with_structured_output(AgentResponseSchema)
 
         async def generate_components(state: AgentState) -> AgentResponseSchema:
-            structured_model = self.client.with_structured_output(AgentResponseSchema)
+            # The data is embedded into the page, it is never pruned
+            data = state["data"]
 
             system_message = """You are an expert web developer specializing in creating data-driven UI components that will be embedded in iframes. Your task is to generate complete, self-contained web components with HTML, CSS, and JavaScript based on the provided data structure, UI component descriptors, and CSS styling guidelines.
 
@@ -80,6 +90,7 @@ class IframeComponentAgent:
             - Ensure generated HTML structure is compatible with the provided CSS classes and selectors
             - Extend the provided styles with additional CSS as needed for data visualization
             - Maintain consistency with the established design system
+            - The design system stylesheet is already linked in the page, do NOT repeat its rules in your CSS
 
             ## TECHNICAL REQUIREMENTS:
 
@@ -92,6 +103,7 @@ class IframeComponentAgent:
 
             ### CSS GENERATION:
             - Build upon the provided CSS descriptor styles
+            - Return ONLY the component-specific CSS which is not already in the design system
             - Add data-specific styling (charts, tables, cards, etc.)
             - Implement responsive behavior that complements the base styles
             - Create smooth transitions and hover effects
@@ -123,7 +135,7 @@ class IframeComponentAgent:
             - Optimize for fast rendering and smooth interactions
             - Include comprehensive data validation and sanitization"""
 
-            human_message = f"""Create a data-driven UI component using the three input sources provided below. Your task is to synthesize these inputs into a cohesive, functional, and visually appealing web component.
+            human_message = f"""Create a data-driven UI component using the input sources provided below. Your task is to synthesize these inputs into a cohesive, functional, and visually appealing web component.
 
                                 ## INPUT SOURCES:
 
@@ -131,12 +143,12 @@ class IframeComponentAgent:
                                 {state['question']}
 
                                 ### 2. DATA TO VISUALIZE:
-                                {state['data']}
+                                {data}
 
                                 ### 3. UI COMPONENT DESCRIPTOR:
                                 {state["ui_descriptor"]}
 
-                                ### 4. CSS STYLING GUIDE:
+                                ### 4. CSS STYLING GUIDE (design system, already linked in the page):
                                 {state["css_descriptors"]}
 
                                 ## GENERATION INSTRUCTIONS:
@@ -161,7 +173,7 @@ class IframeComponentAgent:
                                 ## SPECIFIC IMPLEMENTATION REQUIREMENTS:
 
                                 ### Data Binding:
-                                - Make the provided data accessible through `window.componentData = {state['data']}`
+                                - Make the provided data accessible through `window.componentData = {data}`
                                 - Implement dynamic rendering based on the actual data structure
                                 - Handle edge cases like missing data, empty arrays, or null values
                                 - Create loading and error states for robust user experience
@@ -169,6 +181,7 @@ class IframeComponentAgent:
                                 ### Styling Consistency:
                                 - Prioritize using CSS classes and patterns from the provided CSS descriptor
                                 - Only add new styles when necessary for data visualization features
+                                - Never copy the design system rules into the CSS output, it is linked separately
                                 - Maintain visual consistency with the established design system
                                 - Ensure responsive behavior across different screen sizes
 
@@ -206,7 +219,29 @@ class IframeComponentAgent:
         graph.set_entry_point("generate_components")
         graph.add_edge("generate_components", END)
 
-        return graph.compile(checkpointer=self.checkpoint_saver)
+        return graph.compile(
+            checkpointer=BoundedMemorySaver.from_env(allowed_types=(AgentResponseSchema,))
+        )
+
+    def _initial_state(
+        self, question: str, data: str, ui_descriptor: str, css: str
+    ) -> AgentState:
+        return {
+            "question": question,
+            # Embedded into the page as window.componentData
+            "data": compact_dataset(data, "iframe", tabulated=False),
+            "ui_descriptor": ui_descriptor,
+            "css_descriptors": css,
+        }
+
+    @staticmethod
+    def _result(result: AgentState) -> AgentResponseSchema:
+        if "result" in result and result["result"] is not None:
+            return result["result"]
+        else:
+            raise HTTPException(
+                status_code=500, detail=f"Failed to generate components for Iframe."
+            )
 
     async def generate_iframe_components(
         self,
@@ -214,23 +249,34 @@ class IframeComponentAgent:
         data: str,
         ui_descriptor: str,
         css: str,
+        session_id: str,
     ) -> AgentResponseSchema:
         """Generate page_title, HTML, CSS and JS code."""
 
-        initial_state: AgentState = {
-            "question": question,
-            "data": data,
-            "ui_descriptor": ui_descriptor,
-            "css_descriptors": css,
-        }
-
-        config = RunnableConfig(configurable={"thread_id": "1"})
+        initial_state = self._initial_state(question, data, ui_descriptor, css)
+        config = RunnableConfig(configurable={"thread_id": session_id})
 
         result = await self.graph.ainvoke(initial_state, config=config)
+        return self._result(result)
 
-        if "result" in result and result["result"] is not None:
-            return result["result"]
-        else:
-            raise HTTPException(
-                status_code=500, detail=f"Failed to generate components for Iframe."
-            )
+    async def stream_iframe_components(
+        self,
+        question: str,
+        data: str,
+        ui_descriptor: str,
+        css: str,
+        session_id: str,
+    ) -> AsyncIterator[Event]:
+        """Generate page_title, HTML, CSS and JS code, streaming the progress.
+
+        The node and token events of the graph are followed by a "generated"
+        event with the generated code.
+        """
+
+        initial_state = self._initial_state(question, data, ui_descriptor, css)
+        config = RunnableConfig(configurable={"thread_id": session_id})
+
+        run = GraphRun(self.graph, initial_state, config)
+        async for event in run.events():
+            yield event
+        yield "generated", self._result(run.values)
@@ -1,9 +1,9 @@
-import json
 from typing import Annotated, Any, Optional
 from fastapi import Depends
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from core.common import get_gpt_client
+from core.compaction import compact_dataset
 from langchain_core.messages import HumanMessage, SystemMessage
 
 
@@ -31,7 +31,8 @@ class RechartAgent:
         try:
             user_prompt = request.prompt
             model = self.client.with_structured_output(RechartResponseSchema)
-            data_summary = json.dumps(data)
+            # The model defines the data in the generated component
+            data_summary = compact_dataset(data, "rechart", tabulated=False)
             messages = [
                 SystemMessage(
                     f"""You are a helpful assistant that generates a react component using Recharts library based on the medical data and user requests.
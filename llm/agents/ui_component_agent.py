@@ -1,33 +1,90 @@
 import json
-from typing import Any, Optional, Dict, TypedDict
+import time
+from typing import Any, AsyncIterator, Optional, Dict, TypedDict
 from pydantic import BaseModel, Field
 from fastapi import Depends, HTTPException
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from typing import Annotated
-from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
 from langchain_core.runnables.config import RunnableConfig
-from core.common import get_gpt_client
+from core.checkpointer import BoundedMemorySaver
+from core.compaction import TABLE_FORMAT_NOTE, compact_dataset
+from core.component_classifier import ComponentTypeClassifier
+from core.component_library import ComponentLibrary, library_query
+from core.background_tasks import BackgroundTaskStore
+from core.common import (
+    get_component_classifier,
+    get_component_library,
+    get_gpt_client,
+    get_graph_registry,
+    get_semantic_cache,
+    get_suggestion_store,
+)
+from core.graph_registry import GraphRegistry
+from core.metrics import merge_timings, timed_node
+from core.retrieval import relevant_data
+from core.semantic_cache import SemanticCache, dataset_fingerprint
+from core.sse import Event, GraphRun
 import uuid
 
-checkpoint_saver = InMemorySaver()
 
+class GeneratedComponentSchema(BaseModel):
+    """Schema for structured LLM response."""
 
-class UiComponentResponseSchema(BaseModel):
+    name: Optional[str] = Field(default=None, description="Name of the component.")
+    component: Optional[str] = Field(default=None, description="Component code.")
+    rechartComponents: Optional[list[str]] = Field(
+        default=None, description="List of rechart components used in the component."
+    )
+
+
+class UiComponentMetadata(BaseModel):
+    """Timing breakdown of the generation."""
+
+    node_timings_ms: dict[str, float] = Field(
+        default_factory=dict, description="Duration of each workflow node."
+    )
+    total_ms: float = Field(default=0.0, description="Duration of the workflow.")
+
+
+class UiComponentResponseSchema(GeneratedComponentSchema):
     """Schema for UI component response."""
 
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4()),
         description="Unique component identifier.",
     )
-    name: Optional[str] = Field(default=None, description="Name of the component.")
-    component: Optional[str] = Field(default=None, description="Component code.")
-    rechartComponents: Optional[list[str]] = Field(
-        default=None, description="List of rechart components used in the component."
+    metadata: Optional[UiComponentMetadata] = Field(
+        default=None, description="Timing breakdown of the generation."
+    )
+    suggestions_url: Optional[str] = Field(
+        default=None,
+        description="Path of the prompt suggestions, which are generated in the background.",
     )
 
 
+class PromptSuggestion(BaseModel):
+    """A prompt suggestion for the next question."""
+
+    prompt: str = Field(description="Ready to use prompt for the next question.")
+    description: str = Field(description="Short description of what it explores.")
+
+
+class PromptSuggestions(BaseModel):
+    """Schema for structured LLM response of the prompt suggestions."""
+
+    suggestions: list[PromptSuggestion] = Field(
+        default_factory=list, description="Up to 4 prompt suggestions."
+    )
+
+
+class PromptSuggestionsResponseSchema(PromptSuggestions):
+    """Schema for prompt suggestions response."""
+
+    id: str = Field(description="Identifier of the component.")
+
+
 class UiComponentRequestSchema(BaseModel):
     """Schema for UI component request."""
 
@@ -46,20 +103,56 @@ class AgentState(TypedDict):
     component_descriptors: str
     component_schema: str
     component_type: str  # 'chart' or 'ui'
-    prompt_suggestions: str
     final_response: Optional[UiComponentResponseSchema]
+    node_timings: Annotated[dict[str, float], merge_timings]
     # Conversation memory fields
     conversation_history: list[dict]
     previous_components: list[dict]
 
 
+class SuggestionState(TypedDict):
+    """State of the prompt suggestions generation of a finished component"""
+
+    question: str
+    provided_data: str
+    extracted_data: str
+    component_type: str
+    conversation_history: list[dict]
+    previous_components: list[dict]
+    prompt_suggestions: Optional[PromptSuggestions]
+    node_timings: Annotated[dict[str, float], merge_timings]
+
+
 class UiComponentAgent:
     """Agent for generating UI components directly from user questions and data."""
 
-    def __init__(self, client: Annotated[ChatOpenAI, Depends(get_gpt_client)]):
+    def __init__(
+        self,
+        client: Annotated[ChatOpenAI, Depends(get_gpt_client)],
+        graphs: Annotated[GraphRegistry, Depends(get_graph_registry)],
+        semantic_cache: Annotated[
+            Optional[SemanticCache], Depends(get_semantic_cache)
+        ] = None,
+        suggestions: Annotated[
+            Optional[BackgroundTaskStore], Depends(get_suggestion_store)
+        ] = None,
+        classifier: Annotated[
+            Optional[ComponentTypeClassifier], Depends(get_component_classifier)
+        ] = None,
+        component_library: Annotated[
+            Optional[ComponentLibrary], Depends(get_component_library)
+        ] = None,
+    ):
         self.client = client
-        self.checkpoint_saver = checkpoint_saver
-        self.graph = self._build_graph()
+        self.semantic_cache = semantic_cache
+        self.suggestions = suggestions
+        self.classifier = classifier
+        self.component_library = component_library
+        self.graph = graphs.get("ui_component", self._build_graph)
+        self.suggestions_graph = graphs.get(
+            "ui_component_suggestions", self._build_suggestions_graph
+        )
+        self.checkpoint_saver = self.graph.checkpointer
 
     def _build_context_prompt(self, state: AgentState) -> str:
         """Helper method to build context prompt from conversation history."""
@@ -77,15 +170,37 @@ class UiComponentAgent:
 
         return context_prompt
 
+    def _semantic_cache_for(self, state: AgentState) -> Optional[SemanticCache]:
+        """The semantic cache, unless the question is a follow-up.
+
+        Follow-up questions depend on the conversation, so only the first
+        question of a session is matched against earlier questions.
+        """
+        if len(state.get("conversation_history") or []) > 1:
+            return None
+        return self.semantic_cache
+
     def _build_graph(self):
         """Build the graph workflow for generating components."""
 
         # Graph initialization
         graph = StateGraph(AgentState)
+        structured_output_model = self.client.with_structured_output(
+            GeneratedComponentSchema
+        )
 
         async def extract_data(state: AgentState):
             """Extract data for the user's question."""
 
+            semantic_cache = self._semantic_cache_for(state)
+            namespace = ("extracted_data", dataset_fingerprint(state["provided_data"]))
+            if semantic_cache:
+                cached = semantic_cache.lookup(
+                    namespace, state["question"], state["provided_data"]
+                )
+                if cached is not None:
+                    return {"extracted_data": cached}
+
             context_prompt = self._build_context_prompt(state)
 
             messages = [
@@ -94,6 +209,7 @@ class UiComponentAgent:
             You are a specialized AI assistant. Your task is to answer to the user's question
             carefully from the provided dataset. Extract all the information that answers the question.
             Provide clear rationale for you choice, and return only the relevant information for the question.
+            {TABLE_FORMAT_NOTE} Return the records as objects.
             
             Conversation history:
             {context_prompt}
@@ -102,15 +218,21 @@ class UiComponentAgent:
                 HumanMessage(
                     f"""Provide an answer for the user's question. User's question: {state['question']}
                         
-                        Provided data: {state['provided_data']}"""
+                        Provided data: {relevant_data(state['provided_data'], state['question'])}"""
                 ),
             ]
 
             response = await self.client.ainvoke(messages)
 
             try:
-                state["extracted_data"] = response.content
-                return state
+                if semantic_cache:
+                    semantic_cache.store(
+                        namespace,
+                        state["question"],
+                        response.content,
+                        state["provided_data"],
+                    )
+                return {"extracted_data": response.content}
             except Exception as e:
                 raise HTTPException(
                     status_code=500,
@@ -120,6 +242,12 @@ class UiComponentAgent:
         async def determine_component_type(state: AgentState):
             """Determine if the user wants a chart/graph or a regular UI component."""
 
+            # Clear cases are resolved locally, the LLM only decides the others
+            if self.classifier is not None:
+                component_type = self.classifier.classify(state["question"])
+                if component_type is not None:
+                    return {"component_type": component_type}
+
             context_prompt = self._build_context_prompt(state)
 
             messages = [
@@ -142,7 +270,6 @@ class UiComponentAgent:
                     f"""Determine the component type for this request:
                     
                     User question: {state['question']}
-                    Extracted data: {state['extracted_data']}
                     
                     Respond with either "chart" or "ui" only."""
                 ),
@@ -154,17 +281,25 @@ class UiComponentAgent:
                 component_type = response.content.strip().lower()
                 if component_type not in ["chart", "ui"]:
                     component_type = "ui"  # Default to UI if unclear
-                state["component_type"] = component_type
-                return state
+                return {"component_type": component_type}
             except Exception as e:
                 # Default to UI component if determination fails
-                state["component_type"] = "ui"
-                return state
+                return {"component_type": "ui"}
 
         async def component_descriptor(state: AgentState):
             """Choose a UI component descriptor for the extracted data."""
 
+            # Charts are generated with Recharts, without a UI descriptor
+            if state["component_type"] == "chart":
+                return {}
+
             context_prompt = self._build_context_prompt(state)
+            component_descriptors = state["component_descriptors"]
+            if self.component_library:
+                component_descriptors = self.component_library.select(
+                    library_query(state["question"], state["extracted_data"]),
+                    "ui_component",
+                )
 
             messages = [
                 SystemMessage(
@@ -183,84 +318,35 @@ class UiComponentAgent:
                         
                         Extracted data: {state["extracted_data"]}
                         
-                        Provided UI components: {state['component_descriptors']}"""
+                        Provided UI components: {component_descriptors}"""
                 ),
             ]
 
             response = await self.client.ainvoke(messages)
 
             try:
-                state["component_schema"] = response.content
-                return state
+                return {"component_schema": response.content}
             except Exception as e:
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to choose UI component descriptor: {e}",
                 )
 
-        async def prompt_suggestion(state: AgentState):
-
-            context_prompt = self._build_context_prompt(state)
-
-            messages = [
-                SystemMessage(
-                    f"""You are an expert UX and Data Analytics specialist focused on reducing user friction and improving data exploration efficiency.
-                    Your task is to generate contextual prompt suggestions that help users interact with their data more effectively. 
-                    These suggestions should serve as cognitive shortcuts that reduce mental effort and interaction costs while encouraging deeper data exploration.
-                    
-                    Consider these key aspects when generating suggestions:
-                    - The user's current context and question
-                    - Available data structure and relationships
-                    - Existing components and their capabilities
-                    - Common user workflows and exploration patterns
-                    
-                    Generate up to 4 prompt suggestions that:
-                    - Reduce cognitive load by offering clear starting points
-                    - Minimize interaction cost by providing ready-to-use prompts
-                    - Encourage engagement by suggesting valuable but non-obvious analyses
-                    - Improve task efficiency by guiding users toward optimal data exploration paths
-                    
-                    Each suggestion should be:
-                    - Clear and specific enough to be immediately actionable
-                    - Contextually relevant to the current data and user needs
-                    - Focused on delivering actionable insights
-                    - Aligned with data visualization best practices
-                    
-                    Conversation history:
-                    {context_prompt}
-                    """
-                ),
-                HumanMessage(
-                    f"""Give me at least 4 prompt suggestions based on these informations.
-                    
-                        Overall data: {state['provided_data']}
-                        
-                        User's question: {state['question']}
-                    
-                        Extracted data for the user's question: {state["extracted_data"]}
-                    
-                        Component type: {state["component_type"]}
-                    """
-                ),
-            ]
-
-            response = await self.client.ainvoke(messages)
+        async def final_component_generation(state: AgentState):
+            """Final UI component generation from the extracted data and component descriptor"""
 
-            try:
-                state["prompt_suggestions"] = response.content
-                return state
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to generate prompt suggestions: {e}",
+            semantic_cache = self._semantic_cache_for(state)
+            namespace = (
+                "ui_component",
+                dataset_fingerprint(state["provided_data"]),
+                state["component_type"],
+            )
+            cached = (
+                semantic_cache.lookup(
+                    namespace, state["question"], state["provided_data"]
                 )
-
-        async def final_component_generation(
-            state: AgentState,
-        ) -> UiComponentResponseSchema:
-            """Final UI component generation from the extracted data and component descriptor"""
-            structured_output_model = self.client.with_structured_output(
-                UiComponentResponseSchema
+                if semantic_cache
+                else None
             )
 
             context_prompt = self._build_context_prompt(state)
@@ -281,7 +367,6 @@ class UiComponentAgent:
                          - The component must end with "export default [ComponentName]" statement
                          - Return clean, well-structured React code
                          - Include rechartComponents list with all Recharts components used
-                         - Include prompt suggestions component below the chart
 
                         CRITICAL UUID REQUIREMENT:
                          - The parent/root element of your component MUST have id="{state['uuid']}"
@@ -295,20 +380,6 @@ class UiComponentAgent:
                          - Use text colors: text-light, text-accent, text-highlight
                          - Apply proper spacing and padding
                          - Ensure the parent container takes full available width
-                         - Add prompt suggestions in a row using "flex-container-row" class
-                         - Each prompt suggestion should use "prompt-suggestion-item" class
-                         - Include "prompt-suggestions-container" for the suggestions section
-                         - Add "prompt-suggestions-title" for the section header
-
-                        PROMPT SUGGESTIONS GUIDELINES:
-                         - Display prompt suggestions below the main chart component.
-                         - Wrap all suggestions in a container with the "prompt-suggestions-container" class.
-                         - The container should have a title with the "prompt-suggestions-title" class.
-                         - The suggestions themselves should be in a grid using "prompt-suggestions-grid".
-                         - Each suggestion must be a div with the "prompt-suggestion-item" class.
-                         - Inside each item, use an <h4> tag with class "item-title" for the main prompt question.
-                         - Below the title, use a <p> tag with class "item-subtitle" for the description.
-                         - The AI-generated state['prompt_suggestions'] will be a string containing several suggestions. You need to parse this string and create a separate component for each suggestion.
 
                         Provide your response as:
                          - name: The name of your component (PascalCase)
@@ -326,7 +397,6 @@ class UiComponentAgent:
                         
                         User question: {state['question']}
                         Extracted data: {state['extracted_data']}
-                        Prompt suggestions: {state['prompt_suggestions']}
                         """
                     ),
                 ]
@@ -343,7 +413,6 @@ class UiComponentAgent:
                          - DO NOT use any external dependencies
                          - All functionality must be self-contained within the component
                          - Use React hooks (useState, useEffect, useMemo) for interactivity
-                         - Include prompt suggestions component below the main component
 
                         CRITICAL UUID REQUIREMENT:
                          - The parent/root element of your component MUST have id="{state['uuid']}"
@@ -384,20 +453,6 @@ class UiComponentAgent:
                          - Wrap your main content in "component-container" for consistent styling
                          - Use "container-spacing-normal" for standard spacing, "container-spacing-tight" for compact layouts
                          - Available container classes include: flex-container-*, grid-container-*, component-container, dashboard-container
-                         - Add prompt suggestions in a row using "flex-container-row" class
-                         - Each prompt suggestion should use "prompt-suggestion-item" class
-                         - Include "prompt-suggestions-container" for the suggestions section
-                         - Add "prompt-suggestions-title" for the section header
-
-                        PROMPT SUGGESTIONS GUIDELINES:
-                         - Display prompt suggestions below the main component.
-                         - Wrap all suggestions in a container with the "prompt-suggestions-container" class.
-                         - The container should have a title with the "prompt-suggestions-title" class.
-                         - The suggestions themselves should be in a grid using "prompt-suggestions-grid".
-                         - Each suggestion must be a div with the "prompt-suggestion-item" class.
-                         - Inside each item, use an <h4> tag with class "item-title" for the main prompt question.
-                         - Below the title, use a <p> tag with class "item-subtitle" for the description.
-                         - The AI-generated state['prompt_suggestions'] will be a string containing several suggestions. You need to parse this string and create a separate component for each suggestion.
 
                         STYLING GUIDELINES:
                          - Use the existing CSS custom classes and variables from globals.css
@@ -429,84 +484,185 @@ class UiComponentAgent:
                         UI component descriptor schema: {state['component_schema']}
                         
                         Provided data: {state['extracted_data']}
-                        
-                        Prompt suggestions: {state['prompt_suggestions']}
                         """
                     ),
                 ]
 
-            response = await structured_output_model.ainvoke(messages)
+            if cached is not None:
+                # The cached component is bound to the id of its first request
+                response = GeneratedComponentSchema(
+                    name=cached["name"],
+                    component=(cached["component"] or "").replace(
+                        cached["id"], state["uuid"]
+                    ),
+                    rechartComponents=cached["rechartComponents"],
+                )
+            else:
+                response = await structured_output_model.ainvoke(messages)
+                if semantic_cache:
+                    semantic_cache.store(
+                        namespace,
+                        state["question"],
+                        {
+                            "id": state["uuid"],
+                            "name": response.name,
+                            "component": response.component,
+                            "rechartComponents": response.rechartComponents,
+                        },
+                        state["provided_data"],
+                    )
 
             try:
-                response.id = state["uuid"]
-                state["final_response"] = response
+                final_response = UiComponentResponseSchema(
+                    id=state["uuid"], **response.model_dump()
+                )
 
-                state["previous_components"].append(
+                previous_components = [
+                    *state["previous_components"],
                     {
                         "question": state["question"],
                         "component_name": response.name,
                         "component_code": response.component,
                         "rechartComponents": response.rechartComponents,
-                    }
-                )
+                    },
+                ]
 
-                return state
+                return {
+                    "final_response": final_response,
+                    "previous_components": previous_components,
+                }
             except Exception as e:
                 raise HTTPException(
                     status_code=500, detail=f"Failed to generate final component: {e}"
                 )
 
-        # Add nodes to the graph
-        graph.add_node("extract_data", extract_data)
-        graph.add_node("determine_component_type", determine_component_type)
-        graph.add_node("component_descriptor", component_descriptor)
-        graph.add_node("prompt_suggestion", prompt_suggestion)
-        graph.add_node("final_component_generation", final_component_generation)
+        # Add nodes to the graph, every node records its duration
+        nodes = {
+            "extract_data": extract_data,
+            "determine_component_type": determine_component_type,
+            "component_descriptor": component_descriptor,
+            "final_component_generation": final_component_generation,
+        }
+        for name, node in nodes.items():
+            graph.add_node(name, timed_node("ui_component_node_seconds", name, node))
+
+        # The data extraction and the component type classification are
+        # independent, so they run at the same time. Both are needed by the
+        # descriptor choice. The prompt suggestions are not part of the
+        # workflow, they are generated in the background once the component is
+        # ready.
+        graph.add_edge(START, "extract_data")
+        graph.add_edge(START, "determine_component_type")
+        graph.add_edge(
+            ["extract_data", "determine_component_type"], "component_descriptor"
+        )
+        graph.add_edge("component_descriptor", "final_component_generation")
+        graph.add_edge("final_component_generation", END)
 
-        # Define edges between nodes
-        graph.set_entry_point("extract_data")
-        graph.add_edge("extract_data", "determine_component_type")
+        return graph.compile(
+            checkpointer=BoundedMemorySaver.from_env(allowed_types=(UiComponentResponseSchema,))
+        )
 
-        # Conditional routing based on component type
-        def should_use_descriptor(state: AgentState) -> str:
-            if state["component_type"] == "chart":
-                return "prompt_suggestion"
-            else:
-                return "component_descriptor"
+    def _build_suggestions_graph(self):
+        """Build the workflow of the prompt suggestions, run after the component is ready."""
+        graph = StateGraph(SuggestionState)
+        structured_model = self.client.with_structured_output(PromptSuggestions)
 
-        graph.add_conditional_edges(
-            "determine_component_type",
-            should_use_descriptor,
-            {
-                "component_descriptor": "component_descriptor",
-                "prompt_suggestion": "prompt_suggestion",
-            },
-        )
+        async def prompt_suggestion(state: SuggestionState):
+            """Prompt suggestions for the next question of the user"""
 
-        graph.add_edge("component_descriptor", "prompt_suggestion")
-        graph.add_edge("prompt_suggestion", "final_component_generation")
-        graph.add_edge("final_component_generation", END)
+            context_prompt = self._build_context_prompt(state)
 
-        return graph.compile(checkpointer=self.checkpoint_saver)
+            messages = [
+                SystemMessage(
+                    f"""You are an expert UX and Data Analytics specialist focused on reducing user friction and improving data exploration efficiency.
+                    Your task is to generate contextual prompt suggestions that help users interact with their data more effectively. 
+                    These suggestions should serve as cognitive shortcuts that reduce mental effort and interaction costs while encouraging deeper data exploration.
+                
+                    Consider these key aspects when generating suggestions:
+                    - The user's current context and question
+                    - Available data structure and relationships
+                    - Existing components and their capabilities
+                    - Common user workflows and exploration patterns
+                
+                    Generate up to 4 prompt suggestions that:
+                    - Reduce cognitive load by offering clear starting points
+                    - Minimize interaction cost by providing ready-to-use prompts
+                    - Encourage engagement by suggesting valuable but non-obvious analyses
+                    - Improve task efficiency by guiding users toward optimal data exploration paths
+                
+                    Each suggestion should be:
+                    - Clear and specific enough to be immediately actionable
+                    - Contextually relevant to the current data and user needs
+                    - Focused on delivering actionable insights
+                    - Aligned with data visualization best practices
+                
+                    Provide each suggestion as:
+                    - prompt: The ready-to-use prompt
+                    - description: A short description of what the prompt explores
 
-    async def generate_ui_component(
-        self, question: str, data: str, component_descriptors: json = None
-    ) -> UiComponentResponseSchema:
-        """Generate UI component based on the user's question and the data."""
+                    {TABLE_FORMAT_NOTE}
+                
+                    Conversation history:
+                    {context_prompt}
+                    """
+                ),
+                HumanMessage(
+                    f"""Give me 4 prompt suggestions based on these informations.
+                
+                        Overall data: {relevant_data(state['provided_data'], state['question'])}
+                    
+                        User's question: {state['question']}
+                
+                        Extracted data for the user's question: {state["extracted_data"]}
+                
+                        Component type: {state["component_type"]}
+                    """
+                ),
+            ]
+
+            response = await structured_model.ainvoke(messages)
+            return {"prompt_suggestions": response}
+
+        graph.add_node(
+            "prompt_suggestion",
+            timed_node(
+                "ui_component_node_seconds", "prompt_suggestion", prompt_suggestion
+            ),
+        )
+        graph.add_edge(START, "prompt_suggestion")
+        graph.add_edge("prompt_suggestion", END)
 
-        config = RunnableConfig(configurable={"thread_id": "1"})
+        return graph.compile()
 
-        # Try to retrieve previous state from checkpointer
+    async def generate_prompt_suggestions(self, state: AgentState) -> PromptSuggestions:
+        """Generate prompt suggestions for the next question of the user."""
+        result = await self.suggestions_graph.ainvoke(
+            {
+                "question": state["question"],
+                "provided_data": state["provided_data"],
+                "extracted_data": state["extracted_data"],
+                "component_type": state["component_type"],
+                "conversation_history": state.get("conversation_history") or [],
+                "previous_components": state.get("previous_components") or [],
+            }
+        )
+        return result["prompt_suggestions"]
+
+    def _initial_state(
+        self,
+        question: str,
+        data: str,
+        config: RunnableConfig,
+        component_descriptors: Optional[str],
+    ) -> AgentState:
+        """Initial state of a generation, continuing the conversation of the session."""
+
+        # Try to retrieve previous state of the session from checkpointer
         previous_state: AgentState = None
         try:
-            checkpoints = []
-            for checkpoint in self.checkpoint_saver.list(config):
-                checkpoints.append(checkpoint)
-
-            if checkpoints:
-                latest_checkpoint = max(
-                    checkpoints, key=lambda x: x.metadata.get("step", 0)
-                )
+            latest_checkpoint = self.checkpoint_saver.get_tuple(config)
+            if latest_checkpoint:
                 previous_state = latest_checkpoint.checkpoint["channel_values"]
 
         except Exception as e:
@@ -531,20 +687,79 @@ class UiComponentAgent:
                 {"question": question, "timestamp": str(uuid.uuid4())}
             ]
 
-        initial_state: AgentState = {
+        return {
             "uuid": f"comp_{str(uuid.uuid4()).replace('-', '')[:12]}",
             "question": question,
-            "provided_data": data,
+            "provided_data": compact_dataset(data, "ui_component"),
             "component_descriptors": component_descriptors or "{}",
             "conversation_history": conversation_history,
             "previous_components": previous_components,
+            "node_timings": None,
         }
 
-        result = await self.graph.ainvoke(initial_state, config=config)
-
+    def _response(
+        self, result: AgentState, total_ms: float
+    ) -> UiComponentResponseSchema:
+        """Response of a finished generation, with the suggestions started."""
         if "final_response" in result and result["final_response"] is not None:
-            return result["final_response"]
+            response: UiComponentResponseSchema = result["final_response"]
+            response.metadata = UiComponentMetadata(
+                node_timings_ms=result.get("node_timings") or {}, total_ms=total_ms
+            )
+
+            # The suggestions are not needed to render the component, so they
+            # are generated after the response is returned
+            if self.suggestions is not None:
+                self.suggestions.start(
+                    response.id, self.generate_prompt_suggestions(result)
+                )
+                response.suggestions_url = f"/ui_component/suggestions/{response.id}"
+            return response
 
         return UiComponentResponseSchema(
             name="Failed", component="Failed to generate component."
         )
+
+    async def generate_ui_component(
+        self,
+        question: str,
+        data: str,
+        session_id: str,
+        component_descriptors: json = None,
+    ) -> UiComponentResponseSchema:
+        """Generate UI component based on the user's question and the data."""
+
+        config = RunnableConfig(configurable={"thread_id": session_id})
+        initial_state = self._initial_state(
+            question, data, config, component_descriptors
+        )
+
+        start = time.perf_counter()
+        result = await self.graph.ainvoke(initial_state, config=config)
+        total_ms = round((time.perf_counter() - start) * 1000, 1)
+        return self._response(result, total_ms)
+
+    async def stream_ui_component(
+        self,
+        question: str,
+        data: str,
+        session_id: str,
+        component_descriptors: json = None,
+    ) -> AsyncIterator[Event]:
+        """Generate UI component, streaming the progress of the graph.
+
+        The node and token events of the graph are followed by a "component"
+        event with the generated component.
+        """
+
+        config = RunnableConfig(configurable={"thread_id": session_id})
+        initial_state = self._initial_state(
+            question, data, config, component_descriptors
+        )
+
+        start = time.perf_counter()
+        run = GraphRun(self.graph, initial_state, config)
+        async for event in run.events():
+            yield event
+        total_ms = round((time.perf_counter() - start) * 1000, 1)
+        yield "component", self._response(run.values, total_ms)
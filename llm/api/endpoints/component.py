@@ -1,5 +1,7 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
+from core.admission import admission_slot
+from core.common import get_session_id
 from agents.component_agent import ComponentRequestSchema, ComponentResponseSchema
 from services.component_service import ComponentService
 
@@ -8,15 +10,18 @@ router = APIRouter()
 
 @router.post(
     "/generate",
+    dependencies=[Depends(admission_slot("component"))],
     response_model=ComponentResponseSchema,
     summary="Generate React component",
     description="Generate dynamic UI component for user's question from the medical data.",
 )
 async def generate_component(
-    request: ComponentRequestSchema, service: Annotated[ComponentService, Depends()]
+    request: ComponentRequestSchema,
+    service: Annotated[ComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
 ):
     try:
-        component_response = await service.generate_ui_component(request)
+        component_response = await service.generate_ui_component(request, session_id)
         return component_response
     except Exception as e:
         raise HTTPException(
@@ -1,5 +1,9 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from core.admission import admission_slot
+from core.common import get_session_id
+from core.sse import sse_response
 from services.dashboard.dashboard_final_service import DashboardFinalService
 from services.dashboard.dashboard_layout_service import DashboardLayoutService
 from schemas.dashboard_schema import (
@@ -13,14 +17,20 @@ from schemas.dashboard_schema import (
 router = APIRouter()
 
 
-@router.post("/generate-layouts")
+@router.post(
+    "/generate-layouts", dependencies=[Depends(admission_slot("dashboard_layouts"))]
+)
 async def generate_layouts(
-    request: LayoutRequestSchema, service: Annotated[DashboardLayoutService, Depends()]
+    request: LayoutRequestSchema,
+    service: Annotated[DashboardLayoutService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
 ) -> LayoutResponseSchema:
     request.phase = "layout"
 
     try:
-        return await service.generate_layouts(request)
+        return await service.generate_layouts(request, session_id)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -28,14 +38,38 @@ async def generate_layouts(
         )
 
 
-@router.post("/generate-final")
+@router.post(
+    "/generate-layouts/stream",
+    response_class=StreamingResponse,
+    dependencies=[Depends(admission_slot("dashboard_layouts"))],
+)
+async def stream_layouts(
+    request: LayoutRequestSchema,
+    service: Annotated[DashboardLayoutService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    response: Response,
+):
+    """Generate the layouts, streaming Server-Sent Events: 'node' when a step
+    completes, 'token' for the model output, then 'layout' as each layout is
+    uploaded."""
+    request.phase = "layout"
+    return sse_response(await service.stream_layouts(request, session_id), response)
+
+
+@router.post(
+    "/generate-final", dependencies=[Depends(admission_slot("dashboard_final"))]
+)
 async def generate_final_dashboard(
-    request: FinalRequestSchema, service: Annotated[DashboardFinalService, Depends()]
+    request: FinalRequestSchema,
+    service: Annotated[DashboardFinalService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
 ) -> FinalResponseSchema:
     request.phase = "final"
 
     try:
-        return await service.generate_final(request)
+        return await service.generate_final(request, session_id)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Final api -> Failed to generate dashboard: {e}"
@@ -1,5 +1,9 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from core.admission import admission_slot
+from core.common import get_session_id
+from core.sse import sse_response
 
 from agents.iframe_component_agent import (
     IframeComponentRequestSchema,
@@ -13,16 +17,37 @@ router = APIRouter()
 
 @router.post(
     "/generate",
+    dependencies=[Depends(admission_slot("iframe"))],
     response_model=IframeComponentResponseSchema,
     description="Generate URL and Id for Iframe",
 )
 async def generate_iframe_component(
     request: IframeComponentRequestSchema,
     service: Annotated[IframeComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
 ):
     try:
-        return await service.generate_iframe_component(request)
+        return await service.generate_iframe_component(request, session_id)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to generate URL and Id: {e}"
         )
+
+
+@router.post(
+    "/generate/stream",
+    dependencies=[Depends(admission_slot("iframe"))],
+    response_class=StreamingResponse,
+    description="Generate the Iframe page, streaming Server-Sent Events: 'node' when a step completes, 'token' for the model output, then 'result' with the URL.",
+)
+async def stream_iframe_component(
+    request: IframeComponentRequestSchema,
+    service: Annotated[IframeComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    response: Response,
+):
+    return sse_response(
+        await service.stream_iframe_component(request, session_id), response
+    )
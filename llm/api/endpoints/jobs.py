@@ -0,0 +1,183 @@
+from typing import Annotated, Any, Awaitable, Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import HttpUrl
+from core.common import get_job_manager, get_session_id
+from core.jobs import JobManager
+from agents.component_agent import ComponentRequestSchema
+from agents.iframe_component_agent import IframeComponentRequestSchema
+from agents.rechart_agent import RechartRequestSchema
+from agents.ui_component_agent import UiComponentRequestSchema
+from schemas.dashboard_schema import FinalRequestSchema, LayoutRequestSchema
+from schemas.job_schema import JobSchema, JobSubmittedSchema
+from services.component_service import ComponentService
+from services.dashboard.dashboard_final_service import DashboardFinalService
+from services.dashboard.dashboard_layout_service import DashboardLayoutService
+from services.iframe_component_service import IframeComponentService
+from services.rechart_service import RechartService
+from services.ui_component_service import UiComponentService
+
+
+router = APIRouter()
+
+WebhookUrl = Annotated[
+    Optional[HttpUrl],
+    Query(description="URL which receives the job with a POST once it is finished."),
+]
+
+
+async def _submit(
+    jobs: JobManager,
+    kind: str,
+    run: Callable[[], Awaitable[Any]],
+    webhook_url: Optional[HttpUrl],
+) -> JobSubmittedSchema:
+    if webhook_url:
+        try:
+            await jobs.check_webhook(str(webhook_url))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    job = jobs.submit(kind, run, str(webhook_url) if webhook_url else None)
+    return JobSubmittedSchema(
+        id=job.id, status=job.status, status_url=f"/jobs/{job.id}"
+    )
+
+
+@router.post(
+    "/rechart",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobSubmittedSchema,
+    summary="Submit Rechart Generation",
+)
+async def submit_rechart(
+    request: RechartRequestSchema,
+    service: Annotated[RechartService, Depends()],
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+    webhook_url: WebhookUrl = None,
+):
+    return await _submit(
+        jobs, "rechart", lambda: service.generate_rechart(request), webhook_url
+    )
+
+
+@router.post(
+    "/component",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobSubmittedSchema,
+    summary="Submit React Component Generation",
+)
+async def submit_component(
+    request: ComponentRequestSchema,
+    service: Annotated[ComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+    webhook_url: WebhookUrl = None,
+):
+    return await _submit(
+        jobs,
+        "component",
+        lambda: service.generate_ui_component(request, session_id),
+        webhook_url,
+    )
+
+
+@router.post(
+    "/ui_component",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobSubmittedSchema,
+    summary="Submit UI Component Generation",
+)
+async def submit_ui_component(
+    request: UiComponentRequestSchema,
+    service: Annotated[UiComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+    webhook_url: WebhookUrl = None,
+):
+    return await _submit(
+        jobs,
+        "ui_component",
+        lambda: service.generate_ui_component(request, session_id),
+        webhook_url,
+    )
+
+
+@router.post(
+    "/iframe",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobSubmittedSchema,
+    summary="Submit Iframe Generation",
+)
+async def submit_iframe_component(
+    request: IframeComponentRequestSchema,
+    service: Annotated[IframeComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+    webhook_url: WebhookUrl = None,
+):
+    return await _submit(
+        jobs,
+        "iframe",
+        lambda: service.generate_iframe_component(request, session_id),
+        webhook_url,
+    )
+
+
+@router.post(
+    "/dashboard/layouts",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobSubmittedSchema,
+    summary="Submit Dashboard Layouts Generation",
+)
+async def submit_dashboard_layouts(
+    request: LayoutRequestSchema,
+    service: Annotated[DashboardLayoutService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+    webhook_url: WebhookUrl = None,
+):
+    request.phase = "layout"
+    return await _submit(
+        jobs,
+        "dashboard_layouts",
+        lambda: service.generate_layouts(request, session_id),
+        webhook_url,
+    )
+
+
+@router.post(
+    "/dashboard/final",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobSubmittedSchema,
+    summary="Submit Final Dashboard Generation",
+)
+async def submit_dashboard_final(
+    request: FinalRequestSchema,
+    service: Annotated[DashboardFinalService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+    webhook_url: WebhookUrl = None,
+):
+    request.phase = "final"
+    return await _submit(
+        jobs,
+        "dashboard_final",
+        lambda: service.generate_final(request, session_id),
+        webhook_url,
+    )
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobSchema,
+    summary="Get Job",
+    description="Get the status of a job, and its result once it is finished.",
+)
+async def get_job(
+    job_id: str,
+    jobs: Annotated[JobManager, Depends(get_job_manager)],
+):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
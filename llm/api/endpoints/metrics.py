@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    summary="Application metrics",
+    description="Counters, gauges and timings collected by this worker process.",
+)
+async def get_metrics() -> dict:
+    return metrics.snapshot()
@@ -1,6 +1,7 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from agents.rechart_agent import RechartRequestSchema, RechartResponseSchema
+from core.admission import admission_slot
 from services.rechart_service import RechartService
 
 router = APIRouter()
@@ -8,6 +9,7 @@ router = APIRouter()
 
 @router.post(
     "/generate",
+    dependencies=[Depends(admission_slot("rechart"))],
     response_model=RechartResponseSchema,
     summary="Generate Rechart graph component.",
     description="Generate dynamic Rechart component for user's question from the medical data.",
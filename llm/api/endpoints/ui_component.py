@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import Annotated
+from fastapi.responses import StreamingResponse
+from core.admission import admission_slot
+from core.common import get_session_id
+from core.sse import sse_response
 
 from agents.ui_component_agent import (
+    PromptSuggestionsResponseSchema,
     UiComponentRequestSchema,
     UiComponentResponseSchema,
 )
@@ -13,15 +18,18 @@ router = APIRouter()
 
 @router.post(
     "/generate",
+    dependencies=[Depends(admission_slot("ui_component"))],
     response_model=UiComponentResponseSchema,
     summary="Generate UI Component",
     description="Generate a React component based on the provided prompt. Returns the component name and code.",
 )
 async def generate_ui_component(
-    request: UiComponentRequestSchema, service: Annotated[UiComponentService, Depends()]
+    request: UiComponentRequestSchema,
+    service: Annotated[UiComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
 ):
     try:
-        return await service.generate_ui_component(request)
+        return await service.generate_ui_component(request, session_id)
     except HTTPException as e:
         # Re-raise HTTP exceptions from the service layer
         raise e
@@ -36,3 +44,34 @@ async def generate_ui_component(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate component: {str(e)}",
         )
+
+
+@router.post(
+    "/generate/stream",
+    dependencies=[Depends(admission_slot("ui_component"))],
+    response_class=StreamingResponse,
+    summary="Stream UI Component Generation",
+    description="Generate a React component, streaming Server-Sent Events: 'node' when a step completes, 'token' for the model output, then 'component' with the generated component.",
+)
+async def stream_ui_component(
+    request: UiComponentRequestSchema,
+    service: Annotated[UiComponentService, Depends()],
+    session_id: Annotated[str, Depends(get_session_id)],
+    response: Response,
+):
+    return sse_response(
+        await service.stream_ui_component(request, session_id), response
+    )
+
+
+@router.get(
+    "/suggestions/{component_id}",
+    response_model=PromptSuggestionsResponseSchema,
+    summary="Get Prompt Suggestions",
+    description="Get the prompt suggestions of a generated component. Waits until they are ready.",
+)
+async def get_prompt_suggestions(
+    component_id: str,
+    service: Annotated[UiComponentService, Depends()],
+):
+    return await service.get_prompt_suggestions(component_id)
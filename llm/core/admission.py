@@ -0,0 +1,248 @@
+import asyncio
+import itertools
+import math
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Literal, Optional
+from fastapi import Header, HTTPException, Request
+from core.metrics import metrics
+
+PriorityClass = Literal["interactive", "batch"]
+
+# Interactive requests, a user is waiting, go before the batch ones (jobs)
+CLASS_RANKS = {"interactive": 0, "batch": 1}
+
+# Within a class, the endpoints which end a flow go first. The final dashboard
+# is the last step of a dashboard, the layouts are its first step.
+ENDPOINT_RANKS = {"dashboard_final": 0, "dashboard_layouts": 2}
+DEFAULT_ENDPOINT_RANK = 1
+
+# Concurrent generations per endpoint. A layouts request makes three calls.
+DEFAULT_ENDPOINT_LIMITS = {"dashboard_layouts": 4}
+
+_NO_TIMEOUT = object()
+
+
+def parse_limits(value: str) -> dict[str, int]:
+    """Parse "endpoint=limit,..." into a dict."""
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            endpoint, limit = item.split("=", 1)
+            limits[endpoint.strip()] = int(limit)
+    return limits
+
+
+class _Waiter:
+    def __init__(self, endpoint: str, priority: tuple, bounded: bool) -> None:
+        self.endpoint = endpoint
+        self.priority = priority
+        self.bounded = bounded
+        self.granted = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    """Admission control in front of the LLM bound endpoints.
+
+    A generation runs when the global limit and the limit of its endpoint have
+    a free slot. Otherwise it waits in a bounded queue, ordered by priority:
+    the interactive requests before the batch ones, then by endpoint, then
+    first come first served. A waiter whose endpoint is at its limit does not
+    block the others. Requests are rejected with a 503 and Retry-After when the
+    queue is full or when they waited longer than the deadline, so an overload
+    fails fast instead of slowing every request down.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        endpoint_limits: Optional[dict[str, int]] = None,
+        default_endpoint_limit: int = 8,
+        max_queued: int = 64,
+        queue_timeout: float = 10,
+        retry_after: float = 5,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.endpoint_limits = endpoint_limits or {}
+        self.default_endpoint_limit = default_endpoint_limit
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self.active = 0
+        self._active_by_endpoint: Counter = Counter()
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+
+        metrics.register_gauge("admission_active", lambda: self.active)
+        metrics.register_gauge("admission_queue_depth", lambda: len(self._waiters))
+
+    @classmethod
+    def from_env(cls) -> Optional["AdmissionController"]:
+        """Create the controller with the limits from the environment, or None if it is disabled."""
+        if os.getenv("ADMISSION_ENABLED", "true").lower() not in ("1", "true", "yes"):
+            return None
+
+        return cls(
+            max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", 16)),
+            endpoint_limits={
+                **DEFAULT_ENDPOINT_LIMITS,
+                **parse_limits(os.getenv("ADMISSION_ENDPOINT_LIMITS", "")),
+            },
+            default_endpoint_limit=int(os.getenv("ADMISSION_DEFAULT_ENDPOINT_LIMIT", 8)),
+            max_queued=int(os.getenv("ADMISSION_MAX_QUEUED", 64)),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", 10)),
+            retry_after=float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", 5)),
+        )
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        endpoint: str,
+        priority_class: PriorityClass = "interactive",
+        timeout=_NO_TIMEOUT,
+    ) -> AsyncIterator[None]:
+        """Hold a slot of the endpoint while the block runs.
+
+        The timeout defaults to the queue deadline. With a timeout of None, the
+        caller waits as long as needed and is not limited by the queue size,
+        which is how the jobs wait, since their workers already bound them.
+        """
+        timeout = self.queue_timeout if timeout is _NO_TIMEOUT else timeout
+        await self._acquire(endpoint, priority_class, timeout)
+        try:
+            yield
+        finally:
+            self._release(endpoint)
+
+    def try_acquire(
+        self, endpoint: str, priority_class: PriorityClass = "batch"
+    ) -> bool:
+        """Take a slot of the endpoint if one is free now, without waiting.
+
+        For the optional background work, which is skipped when the server is
+        busy. The slot must be given back with release.
+        """
+        if not self._can_take(endpoint, self._priority(endpoint, priority_class)):
+            metrics.incr(f"admission_rejected.{endpoint}.busy")
+            return False
+        self._grant(endpoint)
+        return True
+
+    def release(self, endpoint: str) -> None:
+        """Give back a slot taken with try_acquire."""
+        self._release(endpoint)
+
+    def _priority(self, endpoint: str, priority_class: PriorityClass) -> tuple:
+        return (
+            CLASS_RANKS.get(priority_class, 0),
+            ENDPOINT_RANKS.get(endpoint, DEFAULT_ENDPOINT_RANK),
+            next(self._sequence),
+        )
+
+    def _can_take(self, endpoint: str, priority: tuple) -> bool:
+        """Whether the request can run now.
+
+        It can unless a waiter with a higher priority could take the slot. The
+        waiters blocked by the limit of their own endpoint do not count.
+        """
+        return self._can_run(endpoint) and not any(
+            w.priority < priority and self._can_run(w.endpoint)
+            for w in self._waiters
+        )
+
+    def _limit(self, endpoint: str) -> int:
+        return self.endpoint_limits.get(endpoint, self.default_endpoint_limit)
+
+    def _can_run(self, endpoint: str) -> bool:
+        return (
+            self.active < self.max_concurrent
+            and self._active_by_endpoint[endpoint] < self._limit(endpoint)
+        )
+
+    def _grant(self, endpoint: str) -> None:
+        self.active += 1
+        self._active_by_endpoint[endpoint] += 1
+
+    def _release(self, endpoint: str) -> None:
+        self.active -= 1
+        self._active_by_endpoint[endpoint] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant the free slots to the waiters, by priority."""
+        for waiter in sorted(self._waiters, key=lambda w: w.priority):
+            if self.active >= self.max_concurrent:
+                break
+            if self._can_run(waiter.endpoint):
+                self._waiters.remove(waiter)
+                self._grant(waiter.endpoint)
+                waiter.granted.set_result(None)
+
+    def _reject(self, endpoint: str, reason: str, detail: str) -> HTTPException:
+        metrics.incr(f"admission_rejected.{endpoint}.{reason}")
+        return HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(math.ceil(self.retry_after))},
+        )
+
+    async def _acquire(
+        self, endpoint: str, priority_class: PriorityClass, timeout: Optional[float]
+    ) -> None:
+        priority = self._priority(endpoint, priority_class)
+        if self._can_take(endpoint, priority):
+            self._grant(endpoint)
+            metrics.observe(f"admission_wait.{endpoint}", 0.0)
+            return
+
+        bounded = timeout is not None
+        if bounded and sum(w.bounded for w in self._waiters) >= self.max_queued:
+            raise self._reject(
+                endpoint, "queue_full", "The server is overloaded, try again later."
+            )
+
+        waiter = _Waiter(endpoint, priority, bounded)
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.granted), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.granted.done():
+                # Granted at the same time, give the slot back
+                self._release(endpoint)
+            else:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(
+                endpoint,
+                "timeout",
+                "The server is busy and the request waited too long, try again later.",
+            )
+        finally:
+            metrics.observe(f"admission_wait.{endpoint}", time.perf_counter() - start)
+
+
+def admission_slot(endpoint: str):
+    """Dependency which holds a slot of the endpoint until the response is sent.
+
+    The priority class comes from the X-Request-Priority header. Streamed
+    responses hold their slot until the stream ends.
+    """
+
+    async def dependency(
+        request: Request,
+        x_request_priority: Annotated[PriorityClass, Header()] = "interactive",
+    ) -> AsyncIterator[None]:
+        admission: Optional[AdmissionController] = request.app.state.admission
+        if admission is None:
+            yield
+            return
+
+        async with admission.admit(endpoint, x_request_priority):
+            yield
+
+    return dependency
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import uuid
+from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+from core.compression import minify, precompress
+from core.metrics import metrics
+from core.storage_backends import StorageBackend
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class Files(BaseModel):
+    page_title: str = Field(default=None, description="Title of the page.")
+    html: str = Field(default=None, description="HTML code.")
+    css: str = Field(default=None, description="CSS code.")
+    js: str = Field(default=None, description="Javascript code.")
+
+
+class ArtifactStorage:
+    """A utility class for storing the generated artifacts.
+
+    This class builds the separate HTML, CSS and Javascript files of an artifact,
+    uploads them to the configured storage backend (Cloudflare R2, local
+    directory or memory) and returns the hosted URL of the artifact.
+
+    The CSS and Javascript files are content addressed: they are stored under
+    the hash of their content in the shared "assets" folder, and uploaded only
+    if no identical file was stored before.
+
+    The design system stylesheet is published once, under a folder versioned by
+    its hash, and linked from every page before the component specific CSS.
+
+    One instance is shared by the whole process.
+    """
+
+    def __init__(
+        self, backend: StorageBackend, design_system_css: Optional[str] = None
+    ) -> None:
+        self.backend = backend
+        self.design_system_css = design_system_css
+        self.design_system_key: Optional[str] = None
+        if design_system_css:
+            digest = hashlib.sha256(design_system_css.encode("utf-8")).hexdigest()[:32]
+            self.design_system_key = f"design-system/{digest}/styles.css"
+        # Keys of the assets which are known to exist in the backend
+        self._stored_assets: set[str] = set()
+        # Uploads of assets in progress, so concurrent duplicates wait for them
+        self._pending_assets: dict[str, asyncio.Task] = {}
+
+    def create_separate_files(
+        self,
+        files,
+        css_href: str = "./styles.css",
+        js_href: str = "./app.js",
+        design_system_href: Optional[str] = None,
+    ):
+        """Build separate codes."""
+
+        design_system_link = (
+            f'<link rel="stylesheet" href="{design_system_href}">'
+            if design_system_href
+            else ""
+        )
+
+        html_content = f"""
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>{files["page_title"]}</title>
+            {design_system_link}
+            <link rel="stylesheet" href="{css_href}">
+        </head>
+        <body>
+            <div class="component-container">
+                {files["html"]}
+            </div>
+            
+            <script src="{js_href}"></script>
+            <script>
+                // Initialize component when DOM is loaded
+                document.addEventListener('DOMContentLoaded', function() {{
+                    if (window.initializeComponent) {{
+                        window.initializeComponent('1');
+                    }}
+                }});
+            </script>
+        </body>
+        </html>
+        """
+
+        css_content = files["css"] or ""
+
+        js_content = files["js"] or ""
+
+        return {"html": html_content, "css": css_content, "javascript": js_content}
+
+    async def _put_file(self, key: str, content: str, content_type: str) -> None:
+        """Minify and precompress the file, then store it with cache headers."""
+        body = await asyncio.to_thread(minify, content, content_type)
+        encodings = await asyncio.to_thread(precompress, body)
+        await self.backend.put_object(
+            key,
+            body,
+            content_type,
+            cache_control=IMMUTABLE_CACHE_CONTROL,
+            encodings=encodings,
+        )
+        metrics.incr("artifact_bytes_uploaded", len(encodings.get("gzip", body)))
+
+    def asset_key(self, content: str, extension: str) -> str:
+        """Content addressed key of a shared asset."""
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+        return f"assets/{digest}.{extension}"
+
+    async def _store_asset(self, key: str, content: str, content_type: str) -> None:
+        """Upload the asset unless an identical one is already stored."""
+        if key in self._stored_assets:
+            metrics.incr("artifact_assets_deduplicated")
+            metrics.incr("artifact_bytes_saved", len(content))
+            return
+
+        pending = self._pending_assets.get(key)
+        if pending is None:
+            pending = asyncio.create_task(self._upload_asset(key, content, content_type))
+            self._pending_assets[key] = pending
+            pending.add_done_callback(lambda _: self._pending_assets.pop(key, None))
+        else:
+            metrics.incr("artifact_assets_deduplicated")
+            metrics.incr("artifact_bytes_saved", len(content))
+
+        await asyncio.shield(pending)
+
+    async def _upload_asset(self, key: str, content: str, content_type: str) -> None:
+        if await self.backend.exists(key):
+            metrics.incr("artifact_assets_deduplicated")
+            metrics.incr("artifact_bytes_saved", len(content))
+        else:
+            await self._put_file(key, content, content_type)
+            metrics.incr("artifact_assets_uploaded")
+        self._stored_assets.add(key)
+
+    async def upload_to_storage(self, files, link_design_system: bool = True) -> str:
+        """Upload files to the storage backend and return the hosted URL.
+
+        The page links the shared design system stylesheet unless
+        link_design_system is False.
+        """
+
+        # Create unique folder id for this app
+        current_time = datetime.now().strftime("%Y%m%d%H%M")
+        folder_key = f"artifact-{current_time}-{str(uuid.uuid4()).replace('-', '')[:4]}"
+
+        # Shared assets are addressed by their content
+        css_key = self.asset_key(files["css"] or "", "css")
+        js_key = self.asset_key(files["js"] or "", "js")
+
+        uploads = []
+        design_system_href = None
+        if link_design_system and self.design_system_key:
+            design_system_href = f"../{self.design_system_key}"
+            uploads.append(
+                self._store_asset(
+                    self.design_system_key, self.design_system_css, "text/css"
+                )
+            )
+
+        # Seperate files
+        separated_files = self.create_separate_files(
+            files,
+            css_href=f"../{css_key}",
+            js_href=f"../{js_key}",
+            design_system_href=design_system_href,
+        )
+
+        try:
+            await asyncio.gather(
+                *uploads,
+                self._put_file(
+                    f"{folder_key}/index.html", separated_files["html"], "text/html"
+                ),
+                self._store_asset(css_key, separated_files["css"], "text/css"),
+                self._store_asset(
+                    js_key, separated_files["javascript"], "application/javascript"
+                ),
+            )
+
+            return self.backend.public_url(f"{folder_key}/index.html")
+
+        except Exception as e:
+            raise Exception(f"Failed to upload files to storage: {str(e)}")
+
+    def close(self) -> None:
+        self.backend.close()
@@ -0,0 +1,109 @@
+import json
+import os
+from types import MappingProxyType
+from typing import Any, Optional
+from core.common import PROJECT_ROOT
+
+ASSETS_HOT_RELOAD = os.getenv("ASSETS_HOT_RELOAD", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only copy of the parsed JSON value."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class Asset:
+    """A file loaded once, with its parsed value and its prompt string."""
+
+    def __init__(self, name: str, path: str, kind: str, optional: bool) -> None:
+        self.name = name
+        self.path = path
+        self.kind = kind
+        self.optional = optional
+        self.mtime: Optional[float] = None
+        self.value: Any = None
+        self.prompt: str = ""
+
+    def load(self) -> None:
+        """Read and parse the file, and serialize it for the prompts."""
+        if not os.path.exists(self.path):
+            if not self.optional:
+                raise RuntimeError(f"Asset '{self.name}' not found at {self.path}")
+            print(f"Warning: Data file not found at {self.path}")
+            self.value = freeze({}) if self.kind == "json" else ""
+            self.prompt = json.dumps({}) if self.kind == "json" else ""
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+            self.mtime = os.path.getmtime(self.path)
+
+            if self.kind == "json":
+                parsed = json.loads(text)
+                self.value = freeze(parsed)
+                self.prompt = json.dumps(parsed)
+            else:
+                self.value = text
+                self.prompt = text
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise RuntimeError(f"Failed to load or parse {self.path}: {e}")
+
+    def is_stale(self) -> bool:
+        try:
+            return os.path.getmtime(self.path) != self.mtime
+        except FileNotFoundError:
+            return False
+
+
+class AssetRegistry:
+    """Registry of the static assets used by the services.
+
+    The assets are loaded and parsed once at startup, and the parsed values are
+    exposed read-only next to their pre-serialized prompt strings. With hot
+    reload enabled, an asset is reloaded when its file changes on disk.
+    """
+
+    def __init__(self, root: str = PROJECT_ROOT, hot_reload: bool = False) -> None:
+        self.root = root
+        self.hot_reload = hot_reload
+        self._assets: dict[str, Asset] = {}
+
+    def register(
+        self, name: str, path: str, kind: str = "json", optional: bool = False
+    ) -> None:
+        """Register and load an asset. kind is either "json" or "text"."""
+        asset = Asset(name, os.path.join(self.root, path), kind, optional)
+        asset.load()
+        self._assets[name] = asset
+
+    def _get(self, name: str) -> Asset:
+        asset = self._assets[name]
+        if self.hot_reload and asset.is_stale():
+            print(f"Reloading asset '{name}' from {asset.path}")
+            asset.load()
+        return asset
+
+    def value(self, name: str) -> Any:
+        """Parsed, read-only value of the asset."""
+        return self._get(name).value
+
+    def prompt(self, name: str) -> str:
+        """Serialized value of the asset, ready to be used in a prompt."""
+        return self._get(name).prompt
+
+
+def create_asset_registry() -> AssetRegistry:
+    """Create the registry with every asset of the application."""
+    assets = AssetRegistry(hot_reload=ASSETS_HOT_RELOAD)
+    assets.register("component_library", "public-mock-data/component_library.json")
+    assets.register("design_system", "public-mock-data/styles.css", kind="text")
+    return assets
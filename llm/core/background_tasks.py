@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Coroutine, Optional
+from core.metrics import metrics
+
+
+class BackgroundTaskStore:
+    """Store of background tasks and their results, keyed by id.
+
+    A task keeps running after the request which started it has returned, and a
+    later request can wait for its result by id. Entries expire after the TTL;
+    an expired task which is still running is cancelled.
+    """
+
+    def __init__(
+        self, name: str, ttl_seconds: float = 600, max_entries: int = 10000
+    ) -> None:
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expires_at, task), oldest first
+        self._tasks: OrderedDict[str, tuple[float, asyncio.Task]] = OrderedDict()
+
+        metrics.register_gauge(f"background_tasks.{name}", lambda: len(self._tasks))
+
+    def start(self, key: str, coroutine: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Run the coroutine in the background and save its task under the key."""
+        self._purge_expired()
+        self.cancel(key)
+
+        task = asyncio.create_task(coroutine)
+        task.add_done_callback(self._on_done)
+        self._tasks[key] = (time.time() + self.ttl_seconds, task)
+        metrics.incr(f"background_tasks_started.{self.name}")
+
+        while len(self._tasks) > self.max_entries:
+            _, (_, oldest) = self._tasks.popitem(last=False)
+            oldest.cancel()
+        return task
+
+    def get(self, key: str) -> Optional[asyncio.Task]:
+        """Get the task of the key, or None if it is missing or expired."""
+        entry = self._tasks.get(key)
+        if entry is None:
+            return None
+        expires_at, task = entry
+        if expires_at < time.time():
+            self.cancel(key)
+            return None
+        return task
+
+    def pop(self, key: str) -> Optional[asyncio.Task]:
+        """Remove the task of the key and return it."""
+        task = self.get(key)
+        self._tasks.pop(key, None)
+        return task
+
+    def cancel(self, key: str) -> None:
+        """Cancel the task of the key if it is still running, and remove it."""
+        entry = self._tasks.pop(key, None)
+        if entry and not entry[1].done():
+            entry[1].cancel()
+            metrics.incr(f"background_tasks_cancelled.{self.name}")
+
+    def cancel_prefix(self, prefix: str) -> None:
+        """Cancel every task whose key starts with the prefix."""
+        for key in [k for k in self._tasks if k.startswith(prefix)]:
+            self.cancel(key)
+
+    def close(self) -> None:
+        """Cancel every running task."""
+        for _, task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        # Retrieve the exception so it is not reported as never retrieved,
+        # it is raised again to the request which waits for the result
+        if not task.cancelled() and task.exception() is not None:
+            metrics.incr(f"background_tasks_failed.{self.name}")
+
+    def _purge_expired(self) -> None:
+        """Drop the expired tasks. Entries share one TTL, so the oldest expire first."""
+        now = time.time()
+        while self._tasks:
+            key, (expires_at, _) = next(iter(self._tasks.items()))
+            if expires_at >= now:
+                break
+            self.cancel(key)
@@ -0,0 +1,168 @@
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Iterable, Sequence
+from langchain_core.runnables.config import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """In-memory checkpointer with bounded size.
+
+    Checkpoints are grouped by thread (one thread per session). Whole threads are
+    evicted when they are idle for longer than the TTL, and the least recently used
+    threads are evicted when there are too many threads or the stored checkpoints
+    exceed the memory cap.
+
+    Only the given types, and the built-in safe types of LangGraph, are loaded
+    back from the checkpoints, so every model stored in the state of the graph
+    must be listed.
+    """
+
+    def __init__(
+        self,
+        max_threads: int = 1000,
+        ttl_seconds: float = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        allowed_types: Iterable[type] = (),
+    ) -> None:
+        super().__init__(
+            serde=JsonPlusSerializer(allowed_msgpack_modules=tuple(allowed_types))
+        )
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.evictions = 0
+
+        # thread_id -> last access time, least recently used first
+        self._access: OrderedDict[str, float] = OrderedDict()
+        self._thread_bytes: dict[str, int] = defaultdict(int)
+        self._thread_blob_keys: dict[str, set] = defaultdict(set)
+        self._thread_write_keys: dict[str, dict] = defaultdict(dict)
+        self._total_bytes = 0
+
+    @classmethod
+    def from_env(cls, allowed_types: Iterable[type] = ()) -> "BoundedMemorySaver":
+        """Create the checkpointer with limits from the environment."""
+        return cls(
+            max_threads=int(os.getenv("CHECKPOINT_MAX_THREADS", 1000)),
+            ttl_seconds=float(os.getenv("CHECKPOINT_TTL_SECONDS", 3600)),
+            max_bytes=int(os.getenv("CHECKPOINT_MAX_BYTES", 256 * 1024 * 1024)),
+            allowed_types=allowed_types,
+        )
+
+    def size(self) -> dict:
+        """Number of stored threads and the approximate size of their checkpoints."""
+        return {
+            "threads": len(self._access),
+            "bytes": self._total_bytes,
+            "evictions": self.evictions,
+        }
+
+    def get_tuple(self, config: RunnableConfig):
+        thread_id = config["configurable"]["thread_id"]
+        if self._is_expired(thread_id):
+            self.delete_thread(thread_id)
+            return None
+
+        checkpoint_tuple = super().get_tuple(config)
+        if checkpoint_tuple is not None:
+            self._touch(thread_id)
+        return checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        added = 0
+        for k, v in new_versions.items():
+            blob_key = (thread_id, checkpoint_ns, k, v)
+            if blob_key not in self._thread_blob_keys[thread_id]:
+                self._thread_blob_keys[thread_id].add(blob_key)
+                added += len(self.blobs[blob_key][1])
+
+        saved_checkpoint, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][
+            checkpoint["id"]
+        ]
+        added += len(saved_checkpoint[1]) + len(saved_metadata[1])
+
+        self._add_bytes(thread_id, added)
+        self._touch(thread_id)
+        self._evict(protected=thread_id)
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        super().put_writes(config, writes, task_id, task_path)
+
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (
+            thread_id,
+            config["configurable"]["checkpoint_ns"],
+            config["configurable"]["checkpoint_id"],
+        )
+        stored = self.writes.get(outer_key, {})
+        outer_bytes = sum(len(w[2][1]) for w in stored.values())
+        previous_bytes = self._thread_write_keys[thread_id].get(outer_key, 0)
+        self._thread_write_keys[thread_id][outer_key] = outer_bytes
+
+        self._add_bytes(thread_id, outer_bytes - previous_bytes)
+        self._touch(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.storage.pop(thread_id, None)
+        for blob_key in self._thread_blob_keys.pop(thread_id, ()):
+            self.blobs.pop(blob_key, None)
+        for outer_key in self._thread_write_keys.pop(thread_id, {}):
+            self.writes.pop(outer_key, None)
+
+        self._total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        self._access.pop(thread_id, None)
+
+    def _add_bytes(self, thread_id: str, value: int) -> None:
+        self._thread_bytes[thread_id] += value
+        self._total_bytes += value
+
+    def _touch(self, thread_id: str) -> None:
+        self._access[thread_id] = time.monotonic()
+        self._access.move_to_end(thread_id)
+
+    def _is_expired(self, thread_id: str) -> bool:
+        last_access = self._access.get(thread_id)
+        return (
+            last_access is not None
+            and time.monotonic() - last_access > self.ttl_seconds
+        )
+
+    def _evict(self, protected: str) -> None:
+        """Evict expired threads, then least recently used ones while over the limits."""
+        now = time.monotonic()
+        for thread_id, last_access in list(self._access.items()):
+            if now - last_access <= self.ttl_seconds:
+                break
+            if thread_id != protected:
+                self.delete_thread(thread_id)
+                self.evictions += 1
+
+        while (
+            len(self._access) > self.max_threads or self._total_bytes > self.max_bytes
+        ):
+            thread_id = next(iter(self._access))
+            if thread_id == protected:
+                break
+            self.delete_thread(thread_id)
+            self.evictions += 1
@@ -1,19 +1,27 @@
 import os
 import json
+import uuid
+from typing import Annotated, Optional
 from dotenv import load_dotenv
+from fastapi import Cookie, Header, Request, Response
 from langchain_openai import ChatOpenAI
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Session cookie, for the clients which do not echo the X-Session-Id header
+SESSION_COOKIE = "session_id"
+SESSION_COOKIE_MAX_AGE_SECONDS = int(os.getenv("SESSION_COOKIE_MAX_AGE_SECONDS", 86400))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
 if not OPENAI_API_KEY:
     print("Api key is not set for Openai.")
 
 
 def get_data(path: str):
     """Get the data from the json file."""
-    PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     DATA_PATH = os.path.join(PROJECT_ROOT, path)
 
     data = {}
@@ -27,13 +35,97 @@ def get_data(path: str):
     return data
 
 
-def get_gpt_client():
-    """Get the GPT client."""
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY is not set")
-    else:
-        gpt_client = ChatOpenAI(
-            model="gpt-4o-mini",
-            api_key=OPENAI_API_KEY,
-        )
-        return gpt_client
+def get_gpt_client(request: Request) -> ChatOpenAI:
+    """Get the shared GPT client of the application."""
+    return request.app.state.llm_clients.get()
+
+
+def get_graph_registry(request: Request):
+    """Get the compiled graph registry of the application."""
+    return request.app.state.graphs
+
+
+def get_layout_store(request: Request):
+    """Get the dashboard layout store of the application."""
+    return request.app.state.layouts
+
+
+def get_artifact_storage(request: Request):
+    """Get the shared artifact storage of the application."""
+    return request.app.state.artifact_storage
+
+
+def get_asset_registry(request: Request):
+    """Get the static asset registry of the application."""
+    return request.app.state.assets
+
+
+def get_dataset_catalog(request: Request):
+    """Get the dataset catalog of the application."""
+    return request.app.state.datasets
+
+
+def get_semantic_cache(request: Request):
+    """Get the semantic cache of the application, or None if it is disabled."""
+    return request.app.state.semantic_cache
+
+
+def get_single_flight(request: Request):
+    """Get the request coalescing layer of the application."""
+    return request.app.state.single_flight
+
+
+def get_suggestion_store(request: Request):
+    """Get the store of the prompt suggestions generated in the background."""
+    return request.app.state.suggestions
+
+
+def get_component_classifier(request: Request):
+    """Get the local component type classifier, or None if it is disabled."""
+    return request.app.state.component_classifier
+
+
+def get_speculative_finals(request: Request):
+    """Get the store of the final dashboards generated speculatively."""
+    return request.app.state.speculative_finals
+
+
+def get_job_manager(request: Request):
+    """Get the manager of the generation jobs."""
+    return request.app.state.jobs
+
+
+def get_admission(request: Request):
+    """Get the admission control of the generations, or None if it is disabled."""
+    return request.app.state.admission
+
+
+def get_component_library(request: Request):
+    """Get the search index of the UI component library."""
+    return request.app.state.component_library
+
+
+def get_session_id(
+    response: Response,
+    x_session_id: Annotated[Optional[str], Header(max_length=128)] = None,
+    session_cookie: Annotated[
+        Optional[str], Cookie(alias=SESSION_COOKIE, max_length=128)
+    ] = None,
+) -> str:
+    """Get the session id of the client from the X-Session-Id header.
+
+    Without the header, the session id of the session cookie is used, and a
+    new session id is created when both are missing. The session id is returned
+    in the X-Session-Id response header and in the session cookie, so the client
+    continues the session with the next request either way.
+    """
+    session_id = x_session_id or session_cookie or uuid.uuid4().hex
+    response.headers["X-Session-Id"] = session_id
+    response.set_cookie(
+        SESSION_COOKIE,
+        session_id,
+        max_age=SESSION_COOKIE_MAX_AGE_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+    return session_id
@@ -0,0 +1,167 @@
+import json
+import os
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from core.metrics import metrics
+
+DATASET_COMPACTION = os.getenv("DATASET_COMPACTION", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")
+
+# Arrays with fewer records are kept as they are
+MIN_TABLE_ROWS = 2
+
+# Keys of a tabulated array of records, which no JSON data of the user has
+TABLE_COLUMNS = "$columns"
+TABLE_ROWS = "$rows"
+
+# Explanation of the tabulated arrays, for the prompts which get tabulated data
+TABLE_FORMAT_NOTE = (
+    f'Arrays of records are written as {{"{TABLE_COLUMNS}": [...], "{TABLE_ROWS}": '
+    "[[...], ...]}, each row holds the values of the columns in order."
+)
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """Load the tokenizer once. None if tiktoken or its encoding is unavailable."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception as e:
+                print(f"Warning: Failed to load the '{TOKENIZER_ENCODING}' tokenizer: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens of the text, estimated from its length without tiktoken."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _plain(value: Any) -> Any:
+    """Convert read-only mappings and tuples back to JSON types."""
+    if isinstance(value, Mapping):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def tabulate(value: Any) -> Any:
+    """Collapse the arrays of records into columns and rows.
+
+    An array of objects is replaced by {"$columns": [...], "$rows": [[...], ...]},
+    so the keys are written once instead of once per record. Missing keys are
+    filled with null.
+    """
+    if isinstance(value, dict):
+        return {k: tabulate(v) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [tabulate(v) for v in value]
+        if len(items) >= MIN_TABLE_ROWS and all(isinstance(v, dict) for v in items):
+            columns = list(dict.fromkeys(k for item in items for k in item))
+            return {
+                TABLE_COLUMNS: columns,
+                TABLE_ROWS: [[item.get(c) for c in columns] for item in items],
+            }
+        return items
+    return value
+
+
+def _is_table(value: dict) -> bool:
+    return set(value) == {TABLE_COLUMNS, TABLE_ROWS} and isinstance(
+        value[TABLE_ROWS], list
+    )
+
+
+def _has_table(value: Any) -> bool:
+    """Whether the value has an object which looks like a tabulated array."""
+    if isinstance(value, dict):
+        return _is_table(value) or any(_has_table(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_table(v) for v in value)
+    return False
+
+
+def untabulate(value: Any) -> Any:
+    """Expand the tabulated arrays of records back into objects."""
+    if isinstance(value, dict):
+        if _is_table(value):
+            return [
+                dict(zip(value[TABLE_COLUMNS], (untabulate(v) for v in row)))
+                for row in value[TABLE_ROWS]
+            ]
+        return {k: untabulate(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [untabulate(v) for v in value]
+    return value
+
+
+def compact_json(value: Any, tabulated: bool = True) -> str:
+    """Serialize the value as minified JSON, with the arrays of records tabulated.
+
+    The tabulated form is only used when it is shorter, which is not the case
+    for the arrays of few records with short keys, and when the data has no
+    object which could be mistaken for a tabulated array. Values which end up
+    in generated code are not tabulated.
+    """
+    value = _plain(value)
+    minified = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    if not tabulated or _has_table(value):
+        return minified
+    tabulated = json.dumps(tabulate(value), separators=(",", ":"), ensure_ascii=False)
+    return tabulated if len(tabulated) < len(minified) else minified
+
+
+@lru_cache(maxsize=64)
+def _compact_text(text: str, tabulated: bool) -> tuple[str, int, int]:
+    try:
+        compacted = compact_json(json.loads(text), tabulated)
+    except (json.JSONDecodeError, TypeError):
+        # Not JSON, e.g. a CSV dataset, only the surrounding whitespace is removed
+        compacted = text.strip()
+    return compacted, count_tokens(text), count_tokens(compacted)
+
+
+def compact_dataset(
+    data: Any, name: Optional[str] = None, tabulated: bool = True
+) -> str:
+    """Compact a dataset before it is put in a prompt.
+
+    The data can be a JSON string, any other text or a parsed JSON value. The
+    result of each dataset is cached, and the tokens before and after the
+    compaction are counted in the metrics. The data which the model copies into
+    generated code must not be tabulated, the prompts which get tabulated data
+    explain its format with TABLE_FORMAT_NOTE.
+    """
+    if data is None:
+        return ""
+    if not DATASET_COMPACTION:
+        return data if isinstance(data, str) else json.dumps(_plain(data))
+
+    text = data if isinstance(data, str) else json.dumps(_plain(data))
+    compacted, tokens_before, tokens_after = _compact_text(text, tabulated)
+
+    metrics.incr("dataset_tokens_before", tokens_before)
+    metrics.incr("dataset_tokens_after", tokens_after)
+    if name:
+        metrics.incr(f"dataset_tokens_saved.{name}", tokens_before - tokens_after)
+    return compacted
@@ -0,0 +1,69 @@
+import os
+import re
+from typing import Optional
+from core.metrics import metrics
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words which name a chart, from the system prompt of the component type node
+CHART_KEYWORDS = frozenset(
+    """chart charts graph graphs plot plots visualization visualisation visualize
+    visualise histogram histograms pie donut doughnut scatter heatmap sparkline
+    radar treemap funnel""".split()
+)
+
+# Words which name a regular UI component
+UI_KEYWORDS = frozenset(
+    """table tables card cards list lists form forms summary summaries summarize
+    summarise text paragraph panel panels accordion accordions dropdown tabs
+    badge badges report narrative""".split()
+)
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class ComponentTypeClassifier:
+    """Local classifier of the component type, "chart" or "ui", of a question.
+
+    Questions which name only charts or only regular UI components are resolved
+    by keyword. The other questions, which name both or neither, return None
+    and are left to the LLM.
+    """
+
+    def __init__(self) -> None:
+        self.local = 0
+        self.fallbacks = 0
+
+        metrics.register_gauge("component_type_fallback_rate", self.fallback_rate)
+
+    @classmethod
+    def from_env(cls) -> Optional["ComponentTypeClassifier"]:
+        """Create the classifier, or None if it is disabled."""
+        if os.getenv("COMPONENT_CLASSIFIER_ENABLED", "true").lower() not in (
+            "1",
+            "true",
+            "yes",
+        ):
+            return None
+
+        return cls()
+
+    def classify(self, question: str) -> Optional[str]:
+        """Component type of the question, or None when it is not clear."""
+        tokens = set(tokenize(question))
+        names_chart = bool(tokens & CHART_KEYWORDS)
+        names_ui = bool(tokens & UI_KEYWORDS)
+
+        if names_chart == names_ui:
+            self.fallbacks += 1
+            metrics.incr("component_type_llm_fallback")
+            return None
+
+        self.local += 1
+        metrics.incr("component_type_local.keywords")
+        return "chart" if names_chart else "ui"
+
+    def fallback_rate(self) -> float:
+        total = self.local + self.fallbacks
+        return round(self.fallbacks / total, 4) if total else 0.0
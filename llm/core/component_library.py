@@ -0,0 +1,109 @@
+import json
+import os
+from functools import lru_cache
+from typing import Any, Optional
+from core.assets import AssetRegistry
+from core.compaction import TABLE_COLUMNS, compact_json
+from core.metrics import metrics
+from core.retrieval import BM25Index, search_tokens
+
+COMPONENT_LIBRARY_TOP_K = int(os.getenv("COMPONENT_LIBRARY_TOP_K", 4))
+
+# Layout building blocks which every page uses, always sent with the selection
+BASE_COMPONENTS = ("Container", "Utility Classes")
+
+
+@lru_cache(maxsize=32)
+def _top_level_keys(data: str) -> str:
+    """Keys of the top-level object of a JSON dataset, or of its records."""
+    try:
+        value = json.loads(data)
+    except (json.JSONDecodeError, TypeError):
+        return ""
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        value = value[0]
+    if not isinstance(value, dict):
+        return ""
+    if TABLE_COLUMNS in value:
+        return " ".join(str(c) for c in value[TABLE_COLUMNS])
+    return " ".join(value)
+
+
+def library_query(question: str, data: Optional[str] = None) -> str:
+    """Search query of the library: the question and the top-level keys of the data.
+
+    The values of the data are left out, so the question decides the selection.
+    """
+    if not data:
+        return question
+    return f"{question} {_top_level_keys(data)}".strip()
+
+
+def _component_text(component: Any) -> str:
+    """Indexed fields of a library entry: name, description, use cases and variants."""
+    variants = " ".join(
+        f"{v.get('name', '')} {v.get('description', '')}"
+        for v in component.get("variants") or ()
+    )
+    return " ".join(
+        [
+            component.get("componentName", ""),
+            component.get("description", ""),
+            " ".join(component.get("useCases") or ()),
+            variants,
+        ]
+    )
+
+
+class ComponentLibrary:
+    """Search index of the UI component library.
+
+    Instead of the whole library, the prompts get the components which are the
+    most relevant to the question and data, ranked with BM25. The index is
+    rebuilt when the library asset is reloaded.
+    """
+
+    def __init__(
+        self, assets: AssetRegistry, top_k: int = COMPONENT_LIBRARY_TOP_K
+    ) -> None:
+        self.assets = assets
+        self.top_k = top_k
+        self._source: Any = None
+        self._index()
+
+    def _index(self) -> tuple[Any, BM25Index]:
+        components = self.assets.value("component_library")
+        if components is not self._source:
+            self._source = components
+            self._bm25 = BM25Index(
+                [search_tokens(_component_text(c)) for c in components]
+            )
+        return components, self._bm25
+
+    def select(self, query: str, name: Optional[str] = None) -> str:
+        """Serialized top-k components for the query, plus the base components.
+
+        The whole library is returned when no component matches the query.
+        """
+        components, bm25 = self._index()
+        scores = bm25.scores(search_tokens(query))
+        ranked = sorted(range(len(components)), key=lambda i: scores[i], reverse=True)
+        top = [i for i in ranked[: self.top_k] if scores[i] > 0]
+
+        if not top:
+            print(f"Component library ({name}): no match, using every component")
+            metrics.incr("component_library_fallbacks")
+            return self.assets.prompt("component_library")
+
+        selection = ", ".join(
+            f"{components[i]['componentName']} ({scores[i]:.2f})" for i in top
+        )
+        print(f"Component library ({name}): selected {selection}")
+        metrics.incr(f"component_library_selections.{name}")
+
+        top += [
+            i
+            for i, c in enumerate(components)
+            if c.get("componentName") in BASE_COMPONENTS and i not in top
+        ]
+        return compact_json([components[i] for i in sorted(top)], tabulated=False)
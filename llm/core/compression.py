@@ -0,0 +1,74 @@
+import gzip
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ARTIFACT_MINIFY = os.getenv("ARTIFACT_MINIFY", "true").lower() in ("1", "true", "yes")
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+BROTLI_QUALITY = int(os.getenv("ARTIFACT_BROTLI_QUALITY", 11))
+
+# File name suffix of each precompressed encoding, in order of preference
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+def _strip_lines(content: str) -> str:
+    """Remove the indentation, trailing whitespace and blank lines."""
+    lines = (line.strip() for line in content.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def minify(content: str, content_type: str) -> str:
+    """Conservatively minify HTML, CSS or Javascript.
+
+    Only whitespace which can not change the rendered output is removed:
+    HTML with whitespace sensitive elements and HTML or Javascript with
+    template literals are left untouched.
+    """
+    if not ARTIFACT_MINIFY or not content:
+        return content
+
+    if content_type == "text/css":
+        return _strip_lines(_CSS_COMMENT.sub("", content))
+    if content_type == "text/html":
+        if "<pre" in content or "<textarea" in content or "`" in content:
+            return content
+        return _strip_lines(content)
+    if content_type == "application/javascript":
+        if "`" in content:
+            return content
+        return _strip_lines(content)
+    return content
+
+
+def precompress(content: str | bytes) -> dict[str, bytes]:
+    """Compress the content with gzip, and brotli when it is installed."""
+    if not ARTIFACT_COMPRESSION:
+        return {}
+
+    body = content.encode("utf-8") if isinstance(content, str) else content
+    encodings = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return encodings
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Parse the encodings accepted by the client from the Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
@@ -0,0 +1,69 @@
+import os
+import threading
+from typing import Optional
+from core.assets import ASSETS_HOT_RELOAD, Asset
+from core.common import PROJECT_ROOT
+from core.compaction import compact_dataset
+from core.retrieval import dataset_index
+
+DEFAULT_DATASET = os.getenv("DEFAULT_DATASET", "technova")
+
+
+class DatasetCatalog:
+    """Catalog of the mock datasets which can be selected by the requests.
+
+    Datasets are registered by id with the path of their JSON file, and a
+    dataset is only read and parsed the first time it is requested, when its
+    search index is built as well. The parsed dataset and its prompt string are
+    shared by every request.
+    """
+
+    def __init__(self, root: str = PROJECT_ROOT, hot_reload: bool = False) -> None:
+        self.root = root
+        self.hot_reload = hot_reload
+        self._datasets: dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def register(self, dataset_id: str, path: str) -> None:
+        """Register a dataset. The file is not read until the dataset is used."""
+        self._datasets[dataset_id] = Asset(
+            dataset_id, os.path.join(self.root, path), kind="json", optional=False
+        )
+
+    def ids(self) -> list[str]:
+        return list(self._datasets)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._datasets
+
+    def get(self, dataset_id: Optional[str] = None) -> Asset:
+        """Get the loaded dataset, or the default one when no id is given.
+
+        Raises KeyError if the dataset is not registered.
+        """
+        dataset_id = dataset_id or DEFAULT_DATASET
+        if dataset_id not in self._datasets:
+            raise KeyError(
+                f"Unknown dataset '{dataset_id}', available: {', '.join(self.ids())}"
+            )
+
+        dataset = self._datasets[dataset_id]
+        if dataset.mtime is None or (self.hot_reload and dataset.is_stale()):
+            with self._lock:
+                if dataset.mtime is None or (self.hot_reload and dataset.is_stale()):
+                    print(f"Loading dataset '{dataset_id}' from {dataset.path}")
+                    dataset.load()
+                    dataset_index(compact_dataset(dataset.prompt))
+        return dataset
+
+    def prompt(self, dataset_id: Optional[str] = None) -> str:
+        """Serialized dataset, ready to be used in a prompt."""
+        return self.get(dataset_id).prompt
+
+
+def create_dataset_catalog() -> DatasetCatalog:
+    """Create the catalog with every dataset of the application."""
+    datasets = DatasetCatalog(hot_reload=ASSETS_HOT_RELOAD)
+    datasets.register("technova", "public-mock-data/technova_dummy_data.json")
+    datasets.register("quantumleap", "public-mock-data/synthetic.json")
+    return datasets
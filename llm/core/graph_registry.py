@@ -0,0 +1,44 @@
+import time
+from typing import Callable
+from langgraph.graph.graph import CompiledGraph
+from core.metrics import metrics
+
+
+class GraphRegistry:
+    """Process-wide registry of compiled LangGraph workflows.
+
+    Each workflow is built and compiled once, on first use or during the startup
+    warm-up, and the same compiled runnable is handed to every request.
+    """
+
+    def __init__(self) -> None:
+        self._graphs: dict[str, CompiledGraph] = {}
+        self.build_times: dict[str, float] = {}
+
+    def get(self, name: str, builder: Callable[[], CompiledGraph]) -> CompiledGraph:
+        """Get the compiled graph by name, building it with the builder if needed."""
+        graph = self._graphs.get(name)
+        if graph is None:
+            start = time.perf_counter()
+            graph = builder()
+            elapsed = time.perf_counter() - start
+
+            self._graphs[name] = graph
+            self.build_times[name] = elapsed
+            metrics.observe(f"graph_build_seconds.{name}", elapsed)
+            self._register_checkpointer_gauges(name, graph)
+        return graph
+
+    def _register_checkpointer_gauges(self, name: str, graph: CompiledGraph) -> None:
+        checkpointer = graph.checkpointer
+        if not hasattr(checkpointer, "size"):
+            return
+
+        for key in ("threads", "bytes", "evictions"):
+            metrics.register_gauge(
+                f"checkpointer_{key}.{name}",
+                lambda key=key: checkpointer.size()[key],
+            )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._graphs
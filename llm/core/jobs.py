@@ -0,0 +1,326 @@
+import asyncio
+import contextvars
+import ipaddress
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlsplit
+import httpx
+from fastapi import HTTPException
+from pydantic import BaseModel
+from core.admission import AdmissionController
+from core.metrics import metrics
+from schemas.job_schema import JobSchema
+
+
+class JobStore:
+    """Store of the generation jobs and their results, keyed by job id.
+
+    Jobs are kept in memory for the TTL and, when a path is given, also in a
+    local SQLite database, so every worker process of the host can answer the
+    status requests and the results survive a restart.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, path: Optional[str] = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        # job_id -> (expires_at, job), oldest first
+        self._jobs: OrderedDict[str, tuple[float, JobSchema]] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    job TEXT NOT NULL
+                )"""
+            )
+            self._db.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        """Create the store with the TTL and SQLite path from the environment."""
+        return cls(
+            ttl_seconds=float(os.getenv("JOB_STORE_TTL_SECONDS", 3600)),
+            path=os.getenv("JOB_STORE_PATH") or None,
+        )
+
+    def put(self, job: JobSchema) -> None:
+        """Save the job. Its TTL starts again from its last change."""
+        expires_at = time.time() + self.ttl_seconds
+
+        self._jobs.pop(job.id, None)
+        self._jobs[job.id] = (expires_at, job)
+        self._purge_expired()
+
+        if self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?)",
+                (job.id, expires_at, job.model_dump_json()),
+            )
+            self._db.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[JobSchema]:
+        """Get the job, or None if it is missing or expired."""
+        entry = self._jobs.get(job_id)
+        if entry:
+            expires_at, job = entry
+            return job if expires_at >= time.time() else None
+
+        if self._db:
+            row = self._db.execute(
+                "SELECT expires_at, job FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row and row[0] >= time.time():
+                return JobSchema.model_validate_json(row[1])
+
+        return None
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def close(self) -> None:
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def _purge_expired(self) -> None:
+        """Drop the expired jobs. Entries share one TTL, so the oldest expire first."""
+        now = time.time()
+        while self._jobs:
+            job_id, (expires_at, _) = next(iter(self._jobs.items()))
+            if expires_at >= now:
+                break
+            del self._jobs[job_id]
+
+
+class JobManager:
+    """Runs the generations submitted as jobs on a bounded pool of workers.
+
+    A submitted job waits in a bounded queue until one of the workers runs it,
+    and its status and result are saved in the job store. When the job has a
+    webhook, the job is posted to it once the job is finished. Webhooks only
+    go to the allowed hosts when an allowlist is configured, and otherwise
+    only to public addresses, never to the host itself or its network. With an
+    admission controller, the jobs run as batch generations, after the
+    interactive requests waiting for the same capacity.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 4,
+        max_queued: int = 100,
+        webhook_timeout: float = 10,
+        webhook_allowed_hosts: frozenset[str] = frozenset(),
+        admission: Optional[AdmissionController] = None,
+    ) -> None:
+        self.store = store
+        self.webhook_allowed_hosts = webhook_allowed_hosts
+        self.admission = admission
+        self.workers = workers
+        self.webhook_timeout = webhook_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._workers: list[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        self.running = 0
+
+        metrics.register_gauge("jobs_queued", self._queue.qsize)
+        metrics.register_gauge("jobs_running", lambda: self.running)
+
+    @classmethod
+    def from_env(
+        cls, admission: Optional[AdmissionController] = None
+    ) -> "JobManager":
+        """Create the manager with the pool size and limits from the environment."""
+        return cls(
+            JobStore.from_env(),
+            workers=int(os.getenv("JOB_WORKERS", 4)),
+            max_queued=int(os.getenv("JOB_MAX_QUEUED", 100)),
+            webhook_timeout=float(os.getenv("JOB_WEBHOOK_TIMEOUT_SECONDS", 10)),
+            webhook_allowed_hosts=frozenset(
+                host.strip().lower()
+                for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",")
+                if host.strip()
+            ),
+            admission=admission,
+        )
+
+    def start(self) -> None:
+        """Start the workers. Must be called from the event loop of the app."""
+        self._client = httpx.AsyncClient(
+            timeout=self.webhook_timeout, follow_redirects=False
+        )
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+
+    async def check_webhook(self, webhook_url: str) -> Optional[str]:
+        """Raise a ValueError when the server must not call the webhook URL.
+
+        With an allowlist, the host must be one of the allowed hosts. Without,
+        every address of the host must be public: loopback, private, link-local
+        and other reserved addresses are rejected, and the validated address to
+        connect to is returned.
+        """
+        host = (urlsplit(webhook_url).hostname or "").lower()
+        if not host:
+            raise ValueError("The webhook URL has no host")
+
+        if self.webhook_allowed_hosts:
+            if host not in self.webhook_allowed_hosts:
+                raise ValueError(f"The webhook host '{host}' is not allowed")
+            return None
+
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                host, None, type=socket.SOCK_STREAM
+            )
+        except socket.gaierror as e:
+            raise ValueError(f"The webhook host '{host}' cannot be resolved: {e}")
+
+        for *_, sockaddr in addresses:
+            address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+            if not address.is_global or address.is_multicast:
+                raise ValueError(f"The webhook host '{host}' is not a public address")
+        return addresses[0][4][0].split("%", 1)[0]
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[], Awaitable[Any]],
+        webhook_url: Optional[str] = None,
+    ) -> JobSchema:
+        """Queue the generation and return its job.
+
+        The generation runs in the context of the request which submitted it.
+        Raises a 503 HTTPException when the queue is full.
+        """
+        if self._queue.full():
+            metrics.incr(f"jobs_rejected.{kind}")
+            raise HTTPException(
+                status_code=503,
+                detail="Too many queued jobs, try again later.",
+                headers={"Retry-After": "10"},
+            )
+
+        job = JobSchema(
+            id=uuid.uuid4().hex, kind=kind, status="queued", created_at=time.time()
+        )
+        self.store.put(job)
+        self._queue.put_nowait((job, run, webhook_url, contextvars.copy_context()))
+        metrics.incr(f"jobs_submitted.{kind}")
+        return job
+
+    def get(self, job_id: str) -> Optional[JobSchema]:
+        return self.store.get(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job, run, webhook_url, context = await self._queue.get()
+            try:
+                await self._run(job, run, context)
+                if webhook_url:
+                    await self._notify(webhook_url, job)
+            except Exception as e:
+                # Keep the worker alive, e.g. when the job store fails
+                print(f"Warning: Failed to complete job {job.id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(
+        self,
+        job: JobSchema,
+        run: Callable[[], Awaitable[Any]],
+        context: contextvars.Context,
+    ) -> None:
+        if self.admission is None:
+            await self._execute(job, run, context)
+            return
+
+        # The worker waits for a slot without deadline, the job queue is bounded
+        async with self.admission.admit(job.kind, "batch", timeout=None):
+            await self._execute(job, run, context)
+
+    async def _execute(
+        self,
+        job: JobSchema,
+        run: Callable[[], Awaitable[Any]],
+        context: contextvars.Context,
+    ) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        self.store.put(job)
+        metrics.observe(f"job_queue_wait.{job.kind}", job.started_at - job.created_at)
+
+        self.running += 1
+        try:
+            result = await asyncio.create_task(run(), context=context)
+            if isinstance(result, BaseModel):
+                result = result.model_dump(mode="json")
+            job.result = result
+            job.status = "succeeded"
+        except HTTPException as e:
+            job.error = str(e.detail)
+            job.status = "failed"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            self.running -= 1
+
+        job.finished_at = time.time()
+        self.store.put(job)
+        metrics.incr(f"jobs_{job.status}.{job.kind}")
+        metrics.observe(f"job_run.{job.kind}", job.finished_at - job.started_at)
+
+    async def _notify(self, webhook_url: str, job: JobSchema) -> None:
+        """Post the finished job to its webhook. Failures are only logged.
+
+        The host is checked again, its addresses may have changed since the
+        submission, and the request is sent to the checked address, so the host
+        cannot resolve to another address in between. The Host header and the
+        TLS server name stay those of the URL. Redirects are not followed.
+        """
+        try:
+            address = await self.check_webhook(webhook_url)
+        except ValueError as e:
+            print(f"Warning: Rejected the webhook of job {job.id}: {e}")
+            metrics.incr("job_webhooks_rejected")
+            return
+
+        url = httpx.URL(webhook_url)
+        headers, extensions = {}, {}
+        if address is not None:
+            headers["Host"] = url.netloc.decode("ascii")
+            extensions["sni_hostname"] = url.host
+            url = url.copy_with(host=address)
+
+        try:
+            response = await self._client.post(
+                url,
+                json=job.model_dump(mode="json"),
+                headers=headers,
+                extensions=extensions,
+            )
+            response.raise_for_status()
+            metrics.incr("job_webhooks_sent")
+        except httpx.HTTPError as e:
+            print(f"Warning: Failed to call the webhook of job {job.id}: {e}")
+            metrics.incr("job_webhooks_failed")
+
+    async def aclose(self) -> None:
+        """Stop the workers, the queued and running jobs are abandoned."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._client:
+            await self._client.aclose()
+        self.store.close()
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional
+from schemas.dashboard_schema import Layout
+
+
+class LayoutStore:
+    """Store of the generated dashboard layouts, keyed by session and layout id.
+
+    Layouts are kept in memory for the TTL and, when a path is given, also in a
+    local SQLite database so they survive a restart of the worker.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, path: Optional[str] = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        # (session_id, layout_id) -> (expires_at, layout), oldest first
+        self._layouts: OrderedDict[tuple[str, str], tuple[float, Layout]] = (
+            OrderedDict()
+        )
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS layouts (
+                    session_id TEXT NOT NULL,
+                    layout_id TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    layout TEXT NOT NULL,
+                    PRIMARY KEY (session_id, layout_id)
+                )"""
+            )
+            self._db.execute("DELETE FROM layouts WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "LayoutStore":
+        """Create the store with the TTL and SQLite path from the environment."""
+        return cls(
+            ttl_seconds=float(os.getenv("LAYOUT_STORE_TTL_SECONDS", 3600)),
+            path=os.getenv("LAYOUT_STORE_PATH") or None,
+        )
+
+    def put(self, session_id: str, layout: Layout) -> None:
+        """Save the layout of the session."""
+        key = (session_id, layout.layout_id)
+        expires_at = time.time() + self.ttl_seconds
+
+        self._layouts.pop(key, None)
+        self._layouts[key] = (expires_at, layout)
+        self._purge_expired()
+
+        if self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO layouts VALUES (?, ?, ?, ?)",
+                (session_id, layout.layout_id, expires_at, layout.model_dump_json()),
+            )
+            self._db.execute("DELETE FROM layouts WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def get(self, session_id: str, layout_id: str) -> Optional[Layout]:
+        """Get the layout of the session, or None if it is missing or expired."""
+        entry = self._layouts.get((session_id, layout_id))
+        if entry:
+            expires_at, layout = entry
+            return layout if expires_at >= time.time() else None
+
+        if self._db:
+            row = self._db.execute(
+                "SELECT expires_at, layout FROM layouts WHERE session_id = ? AND layout_id = ?",
+                (session_id, layout_id),
+            ).fetchone()
+            if row and row[0] >= time.time():
+                return Layout.model_validate_json(row[1])
+
+        return None
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    def close(self) -> None:
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def _purge_expired(self) -> None:
+        """Drop the expired layouts. Entries share one TTL, so the oldest expire first."""
+        now = time.time()
+        while self._layouts:
+            key, (expires_at, _) = next(iter(self._layouts.items()))
+            if expires_at >= now:
+                break
+            del self._layouts[key]
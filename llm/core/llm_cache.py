@@ -0,0 +1,243 @@
+import asyncio
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from pydantic import BaseModel
+from core.metrics import metrics
+
+# Disabled for the requests of the endpoints which opted out of the cache
+llm_cache_enabled: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "llm_cache_enabled", default=True
+)
+
+LLM_CACHE_EXCLUDE_PATHS = [
+    path.strip()
+    for path in os.getenv("LLM_CACHE_EXCLUDE_PATHS", "").split(",")
+    if path.strip()
+]
+
+
+def _portable(generations: Sequence[Any]) -> list:
+    """Replace the parsed structured outputs with plain dicts.
+
+    The structured output parser accepts a dict, so every cache hit builds a new
+    model instance and the cached generations can be serialized to disk.
+    """
+    portable = []
+    for generation in generations:
+        if isinstance(generation, ChatGeneration):
+            parsed = generation.message.additional_kwargs.get("parsed")
+            if isinstance(parsed, BaseModel):
+                message = generation.message.model_copy(
+                    update={
+                        "additional_kwargs": {
+                            **generation.message.additional_kwargs,
+                            "parsed": parsed.model_dump(),
+                        }
+                    }
+                )
+                generation = generation.model_copy(update={"message": message})
+        portable.append(generation)
+    return portable
+
+
+class TieredLLMCache(BaseCache):
+    """Exact match cache of the LLM responses.
+
+    Entries are keyed by the hash of the serialized messages and the LLM string,
+    which holds the model, its parameters and the structured output schema. The
+    most recent entries are kept in an in-memory LRU, and every entry is also
+    saved in a local SQLite database when a path is given. Both tiers share one
+    TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        path: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, generations), least recently used first
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    generations TEXT NOT NULL
+                )"""
+            )
+            self._db.execute(
+                "DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),)
+            )
+            self._db.commit()
+
+        metrics.register_gauge("llm_cache_entries", lambda: len(self._entries))
+
+    @classmethod
+    def from_env(cls) -> Optional["TieredLLMCache"]:
+        """Create the cache from the environment, or None if it is disabled."""
+        if os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024)),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", 86400)),
+            path=os.getenv("LLM_CACHE_PATH") or None,
+        )
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _lookup_memory(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, generations = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return generations
+
+    def _lookup_disk(self, key: str) -> Optional[tuple[float, RETURN_VAL_TYPE]]:
+        """Read the entry from SQLite. The caller promotes it to the memory tier."""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT expires_at, generations FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if not row or row[0] < time.time():
+            return None
+        return row[0], loads(row[1], allowed_objects=[ChatGeneration, AIMessage])
+
+    def _remember(self, key: str, generations: list, expires_at: float) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (expires_at, generations)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save_disk(self, key: str, generations: list, expires_at: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)",
+                (key, expires_at, dumps(generations)),
+            )
+            self._db.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up the cached generations of the prompt."""
+        if not llm_cache_enabled.get():
+            metrics.incr("llm_cache_bypassed")
+            return None
+
+        key = self._key(prompt, llm_string)
+        generations = self._lookup_memory(key)
+        if generations is not None:
+            metrics.incr("llm_cache_hits_memory")
+            return generations
+
+        if self._db:
+            entry = self._lookup_disk(key)
+            if entry is not None:
+                expires_at, generations = entry
+                self._remember(key, generations, expires_at)
+                metrics.incr("llm_cache_hits_disk")
+                return generations
+
+        metrics.incr("llm_cache_misses")
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Cache the generations of the prompt."""
+        if not llm_cache_enabled.get():
+            return
+
+        key = self._key(prompt, llm_string)
+        generations = _portable(return_val)
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, generations, expires_at)
+        if self._db:
+            self._save_disk(key, generations, expires_at)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up the memory tier inline and the disk tier in a worker thread."""
+        if not llm_cache_enabled.get():
+            metrics.incr("llm_cache_bypassed")
+            return None
+
+        key = self._key(prompt, llm_string)
+        generations = self._lookup_memory(key)
+        if generations is not None:
+            metrics.incr("llm_cache_hits_memory")
+            return generations
+
+        if self._db:
+            entry = await asyncio.to_thread(self._lookup_disk, key)
+            if entry is not None:
+                expires_at, generations = entry
+                self._remember(key, generations, expires_at)
+                metrics.incr("llm_cache_hits_disk")
+                return generations
+
+        metrics.incr("llm_cache_misses")
+        return None
+
+    async def aupdate(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ) -> None:
+        if not llm_cache_enabled.get():
+            return
+
+        key = self._key(prompt, llm_string)
+        generations = _portable(return_val)
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, generations, expires_at)
+        if self._db:
+            await asyncio.to_thread(self._save_disk, key, generations, expires_at)
+
+    def clear(self, **kwargs: Any) -> None:
+        self._entries.clear()
+        if self._db:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+
+class LLMCacheBypassMiddleware:
+    """ASGI middleware which disables the LLM cache for the excluded endpoints."""
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ()) -> None:
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.exclude_paths:
+            return await self.app(scope, receive, send)
+
+        enabled = not scope["path"].startswith(self.exclude_paths)
+        token = llm_cache_enabled.set(enabled)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            llm_cache_enabled.reset(token)
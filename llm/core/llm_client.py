@@ -0,0 +1,143 @@
+import asyncio
+import os
+from typing import Optional
+import httpx
+from langchain_core.caches import BaseCache
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field, PrivateAttr
+from core.common import OPENAI_API_KEY
+
+
+class LLMClientSettings(BaseModel):
+    """Connection pool and concurrency settings of the shared LLM clients."""
+
+    default_model: str = Field(default="gpt-4o-mini", description="Default model.")
+    max_connections: int = Field(
+        default=100, description="Max open connections in the shared pool."
+    )
+    max_keepalive_connections: int = Field(
+        default=20, description="Max idle connections kept alive in the pool."
+    )
+    keepalive_expiry: float = Field(
+        default=30.0, description="Seconds an idle connection is kept alive."
+    )
+    timeout: float = Field(default=120.0, description="Request timeout in seconds.")
+    http2: bool = Field(default=False, description="Use HTTP/2 for the LLM API.")
+    max_concurrency: int = Field(
+        default=16, description="Max in-flight LLM calls per model."
+    )
+
+    @classmethod
+    def from_env(cls) -> "LLMClientSettings":
+        """Read the settings from the environment, falling back to the defaults."""
+        defaults = cls()
+        return cls(
+            default_model=os.getenv("LLM_MODEL", defaults.default_model),
+            max_connections=int(
+                os.getenv("LLM_MAX_CONNECTIONS", defaults.max_connections)
+            ),
+            max_keepalive_connections=int(
+                os.getenv(
+                    "LLM_MAX_KEEPALIVE_CONNECTIONS", defaults.max_keepalive_connections
+                )
+            ),
+            keepalive_expiry=float(
+                os.getenv("LLM_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)
+            ),
+            timeout=float(os.getenv("LLM_TIMEOUT", defaults.timeout)),
+            http2=os.getenv("LLM_HTTP2", str(defaults.http2)).lower()
+            in ("1", "true", "yes"),
+            max_concurrency=int(
+                os.getenv("LLM_MAX_CONCURRENCY", defaults.max_concurrency)
+            ),
+        )
+
+
+class ThrottledChatOpenAI(ChatOpenAI):
+    """ChatOpenAI which limits the number of concurrent calls with a semaphore."""
+
+    _semaphore: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+
+    def set_concurrency_limit(self, limit: int) -> None:
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def _agenerate(self, *args, **kwargs):
+        if self._semaphore is None:
+            return await super()._agenerate(*args, **kwargs)
+
+        async with self._semaphore:
+            return await super()._agenerate(*args, **kwargs)
+
+    async def _astream(self, *args, **kwargs):
+        if self._semaphore is None:
+            async for chunk in super()._astream(*args, **kwargs):
+                yield chunk
+            return
+
+        async with self._semaphore:
+            async for chunk in super()._astream(*args, **kwargs):
+                yield chunk
+
+
+class LLMClientRegistry:
+    """Process-wide registry of LLM clients.
+
+    Every client shares one keep-alive HTTP connection pool, so the agents reuse
+    open connections instead of paying for a new TLS handshake on each request.
+    Clients are created lazily, one per model, and each model has its own
+    concurrency limit. When a response cache is given, every client looks up
+    the cache before calling the API.
+    """
+
+    def __init__(
+        self,
+        settings: LLMClientSettings | None = None,
+        cache: BaseCache | None = None,
+    ) -> None:
+        self.settings = settings or LLMClientSettings()
+        self.cache = cache
+        self._clients: dict[str, ThrottledChatOpenAI] = {}
+        self._http_client = httpx.AsyncClient(
+            http2=self._http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+                keepalive_expiry=self.settings.keepalive_expiry,
+            ),
+            timeout=self.settings.timeout,
+        )
+
+    def _http2_enabled(self) -> bool:
+        if not self.settings.http2:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("Warning: HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            return False
+        return True
+
+    def get(self, model: str | None = None) -> ChatOpenAI:
+        """Get the shared client of the model."""
+        if not OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is not set")
+
+        model = model or self.settings.default_model
+        client = self._clients.get(model)
+        if client is None:
+            client = ThrottledChatOpenAI(
+                model=model,
+                api_key=OPENAI_API_KEY,
+                http_async_client=self._http_client,
+                cache=self.cache,
+            )
+            client.set_concurrency_limit(self.settings.max_concurrency)
+            self._clients[model] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP connection pool."""
+        self._clients.clear()
+        await self._http_client.aclose()
+        if self.cache is not None and hasattr(self.cache, "close"):
+            self.cache.close()
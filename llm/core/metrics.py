@@ -0,0 +1,99 @@
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+
+
+class TimingStats:
+    """Summary of observed durations."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "last": round(self.last, 6),
+        }
+
+
+class Metrics:
+    """In-process counters, gauges and timings of the application.
+
+    Metric names are dotted strings, e.g. "graph_build_seconds.dashboard".
+    Gauges can also be registered as callables which are evaluated on snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = defaultdict(float)
+        self._gauges: dict[str, float] = {}
+        self._gauge_providers: dict[str, Callable[[], float]] = {}
+        self._timings: dict[str, TimingStats] = defaultdict(TimingStats)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def register_gauge(self, name: str, provider: Callable[[], float]) -> None:
+        self._gauge_providers[name] = provider
+
+    def observe(self, name: str, seconds: float) -> None:
+        self._timings[name].observe(seconds)
+
+    def snapshot(self) -> dict:
+        gauges = dict(self._gauges)
+        for name, provider in self._gauge_providers.items():
+            try:
+                gauges[name] = provider()
+            except Exception as e:
+                print(f"Warning: failed to read gauge {name}: {e}")
+
+        return {
+            "counters": dict(self._counters),
+            "gauges": gauges,
+            "timings": {name: t.to_dict() for name, t in self._timings.items()},
+        }
+
+
+metrics = Metrics()
+
+
+def merge_timings(
+    current: Optional[dict[str, float]], update: Optional[dict[str, float]]
+) -> dict[str, float]:
+    """Graph state reducer of the node timings. An update of None resets them."""
+    if update is None:
+        return {}
+    return {**(current or {}), **update}
+
+
+def timed_node(
+    metric: str, name: str, node: Callable[[Any], Awaitable[Optional[dict]]]
+) -> Callable[[Any], Awaitable[dict]]:
+    """Wrap an async graph node to record its duration.
+
+    The duration is observed as "<metric>.<name>" and added to the
+    "node_timings" of the state update, in milliseconds.
+    """
+
+    async def run(state: Any) -> dict:
+        start = time.perf_counter()
+        update = await node(state)
+        seconds = time.perf_counter() - start
+        metrics.observe(f"{metric}.{name}", seconds)
+        return {**(update or {}), "node_timings": {name: round(seconds * 1000, 1)}}
+
+    return run
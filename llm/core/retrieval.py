@@ -0,0 +1,228 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Union
+from core.compaction import compact_json, count_tokens, untabulate
+from core.metrics import metrics
+
+RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Datasets up to this size are sent whole, larger ones are pruned to it
+RETRIEVAL_TOKEN_BUDGET = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", 16000))
+# Subtrees up to this size are indexed as one chunk
+RETRIEVAL_CHUNK_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", 200))
+
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Path of a subtree: object keys and array indexes
+Path = tuple[Union[str, int], ...]
+
+
+def search_tokens(text: str) -> list[str]:
+    """Lowercased, stemmed words of the text. Camel case keys are split."""
+    tokens = []
+    for word in _WORD.findall(text):
+        word = word.lower()
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 ranking over tokenized documents."""
+
+    def __init__(
+        self, documents: Sequence[list[str]], k1: float = 1.5, b: float = 0.75
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.average_length = (
+            sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        )
+
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: list[str]) -> list[float]:
+        """BM25 score of every document for the query."""
+        terms = [t for t in set(query) if t in self.idf]
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+
+class Chunk:
+    """A subtree of the dataset. With keys, only these scalar fields of the object."""
+
+    def __init__(self, path: Path, value: Any, keys: Optional[tuple] = None) -> None:
+        self.path = path
+        self.keys = keys
+        self.tokens = count_tokens(compact_json(value))
+        self.text = " ".join(str(p) for p in path) + " " + _text_of(value)
+
+
+def _text_of(value: Any) -> str:
+    """Keys and values of the subtree, for the search."""
+    if isinstance(value, dict):
+        return " ".join(f"{k} {_text_of(v)}" for k, v in value.items())
+    if isinstance(value, list):
+        return " ".join(_text_of(v) for v in value)
+    return "" if value is None else str(value)
+
+
+class DatasetIndex:
+    """Search index of the subtrees of a JSON dataset.
+
+    The dataset is split into chunks: subtrees which are small enough are one
+    chunk, larger objects are split into their child subtrees plus one chunk of
+    their scalar fields, and larger arrays into their items. The chunks are
+    ranked with BM25 over their paths, keys and values.
+    """
+
+    def __init__(self, value: Any, chunk_tokens: int = RETRIEVAL_CHUNK_TOKENS) -> None:
+        self.value = value
+        self.chunk_tokens = chunk_tokens
+        self.total_tokens = count_tokens(compact_json(value))
+        self.chunks: list[Chunk] = []
+        self._split((), value)
+        self.bm25 = BM25Index([search_tokens(c.text) for c in self.chunks])
+
+    def _split(self, path: Path, value: Any) -> None:
+        if not isinstance(value, (dict, list)) or (
+            count_tokens(compact_json(value)) <= self.chunk_tokens
+        ):
+            self.chunks.append(Chunk(path, value))
+            return
+
+        if isinstance(value, dict):
+            scalars = {
+                k: v for k, v in value.items() if not isinstance(v, (dict, list))
+            }
+            if scalars:
+                self.chunks.append(Chunk(path, scalars, keys=tuple(scalars)))
+            for key, child in value.items():
+                if isinstance(child, (dict, list)):
+                    self._split(path + (key,), child)
+        else:
+            for index, child in enumerate(value):
+                self._split(path + (index,), child)
+
+    def select(self, question: str, budget: int) -> Optional[Any]:
+        """The pruned dataset with the most relevant chunks which fit the budget.
+
+        None when no chunk matches the question.
+        """
+        scores = self.bm25.scores(search_tokens(question))
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score > 0),
+            key=lambda i: scores[i],
+            reverse=True,
+        )
+        if not ranked:
+            return None
+
+        selected: dict[Path, Optional[tuple]] = {}
+        used = 0
+        for i in ranked:
+            chunk = self.chunks[i]
+            if used + chunk.tokens > budget:
+                continue
+            selected[chunk.path] = chunk.keys
+            used += chunk.tokens
+
+        if not selected:
+            return None
+        return _prune(self.value, (), selected)
+
+
+def _prune(value: Any, path: Path, selected: dict[Path, Optional[tuple]]) -> Any:
+    """Keep the selected chunks of the value, at their original place."""
+    if path in selected and selected[path] is None:
+        return value
+
+    if isinstance(value, dict):
+        keys = selected.get(path) or ()
+        pruned = {k: value[k] for k in keys}
+        for key, child in value.items():
+            if isinstance(child, (dict, list)):
+                child = _prune(child, path + (key,), selected)
+                if child is not None:
+                    pruned[key] = child
+        return pruned or None
+
+    if isinstance(value, list):
+        pruned = [
+            child
+            for child in (
+                _prune(item, path + (i,), selected) for i, item in enumerate(value)
+            )
+            if child is not None
+        ]
+        return pruned or None
+
+    return None
+
+
+@lru_cache(maxsize=32)
+def dataset_index(data: str) -> Optional[DatasetIndex]:
+    """Index of the dataset, built once per dataset. None if it is not JSON."""
+    try:
+        value = json.loads(data)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+    # Only expand the arrays tabulated by the compaction, not the user's objects
+    expanded = untabulate(value)
+    if compact_json(expanded) == data:
+        value = expanded
+    return DatasetIndex(value)
+
+
+def relevant_data(data: str, question: str, budget: Optional[int] = None) -> str:
+    """The dataset, pruned to the parts relevant to the question when it is too large.
+
+    The whole dataset is returned when it fits the token budget, so the model
+    can answer questions about all of it. Only larger datasets are pruned, and
+    they are also returned whole when they are not JSON or when nothing in them
+    matches the question.
+    """
+    budget = budget or RETRIEVAL_TOKEN_BUDGET
+    if not RETRIEVAL_ENABLED or not data:
+        return data
+
+    index = dataset_index(data)
+    if index is None or index.total_tokens <= budget:
+        metrics.incr("retrieval_full_dataset")
+        return data
+
+    pruned = index.select(question, budget)
+    if pruned is None:
+        metrics.incr("retrieval_fallbacks")
+        return data
+
+    relevant = compact_json(pruned)
+    metrics.incr("retrieval_selections")
+    metrics.incr("retrieval_tokens_saved", index.total_tokens - count_tokens(relevant))
+    return relevant
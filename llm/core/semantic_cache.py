@@ -0,0 +1,269 @@
+import hashlib
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+from core.metrics import metrics
+
+# Sparse, L2 normalized embedding: dimension -> weight
+Vector = dict[int, float]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words of the dataset, with the camel case keys split
+_DATA_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+")
+
+# Words which do not change what the user asks for
+_STOPWORDS = frozenset(
+    """a an and are as at be by can create display do for from generate get give
+    how i in is it me my of on or per please show the to want what which with
+    you""".split()
+)
+
+# Words which change the answer while the rest of the question stays the same
+_NEGATIONS = frozenset(
+    "no not non none without except excluding exclude never".split()
+)
+_COMPARATIVES = frozenset(
+    """above below over under more less greater fewer higher lower highest lowest
+    top bottom ascending descending asc desc increasing decreasing min max
+    minimum maximum most least before after first last latest earliest best
+    worst largest smallest biggest between than""".split()
+)
+
+
+def dataset_fingerprint(data: str) -> str:
+    """Short hash of the dataset, used to partition the cache by dataset."""
+    return hashlib.sha256((data or "").encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=32)
+def dataset_vocabulary(data: Optional[str]) -> frozenset[str]:
+    """Stemmed words of the field names and values of the dataset."""
+    return frozenset(
+        _stem(word.lower())
+        for word in _DATA_WORD.findall(data or "")
+        if word.lower() not in _STOPWORDS
+    )
+
+
+def key_terms(text: str, vocabulary: frozenset[str] = frozenset()) -> frozenset[str]:
+    """Words of the question which change the answer.
+
+    These are the numbers, negations and comparatives, and the words which name
+    a field or a value of the dataset, so "revenue for 2023" and "revenue for
+    2024", "churn above 10" and "churn below 10", or "engineering department"
+    and "sales department" have different terms. The other words, such as
+    "chart" or "show", are left to the embedding similarity.
+    """
+    terms = set()
+    for token in _TOKEN.findall(text.lower()):
+        stem = _stem(token)
+        if (
+            token.isdigit()
+            or token in _NEGATIONS
+            or token in _COMPARATIVES
+            or stem in vocabulary
+        ):
+            terms.add(stem)
+    return frozenset(terms)
+
+
+def _stem(token: str) -> str:
+    for suffix in ("ies", "es", "s"):
+        if token.endswith(suffix) and len(token) > len(suffix) + 2:
+            return token[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return token
+
+
+class HashingEmbedder:
+    """Deterministic bag of words embedding which needs no model download.
+
+    Tokens are lowercased, stemmed and hashed into a fixed number of dimensions
+    with a sign bit, so the embedding is stable across processes.
+    """
+
+    def __init__(self, dimensions: int = 1024) -> None:
+        self.dimensions = dimensions
+
+    def embed(self, text: str) -> Vector:
+        vector: Vector = {}
+        for token in _TOKEN.findall(text.lower()):
+            if token in _STOPWORDS:
+                continue
+            digest = hashlib.blake2b(_stem(token).encode("utf-8"), digest_size=8)
+            value = int.from_bytes(digest.digest(), "big")
+            index = value % self.dimensions
+            sign = 1.0 if value >> 63 else -1.0
+            vector[index] = vector.get(index, 0.0) + sign
+        return _normalize(vector)
+
+
+class SentenceTransformerEmbedder:
+    """Embedding of a local sentence-transformers model."""
+
+    def __init__(self, model_name: str) -> None:
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, text: str) -> Vector:
+        embedding = self.model.encode(text, normalize_embeddings=True)
+        return {i: float(v) for i, v in enumerate(embedding) if v}
+
+
+def _normalize(vector: Vector) -> Vector:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {i: v / norm for i, v in vector.items()}
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    """Cosine similarity of two normalized vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+class SemanticCache:
+    """Cache of generated results, looked up by the similarity of the questions.
+
+    Results are partitioned by namespace, which holds the kind of result, the
+    dataset fingerprint and the component type, so a question only matches
+    earlier questions about the same data. Each namespace keeps the most recent
+    entries in a small in-process index, searched exhaustively.
+
+    A similar question only matches when it has the same key terms: the
+    embedding decides between the rephrasings, but a question about another
+    number, filter, direction, field or entity of the dataset is never served
+    the result of an earlier one.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        threshold: float = 0.8,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600,
+        max_namespaces: int = 256,
+    ) -> None:
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_namespaces = max_namespaces
+        # namespace -> question -> (expires_at, embedding, key terms, value),
+        # oldest first
+        self._indexes: OrderedDict[
+            tuple, OrderedDict[str, tuple[float, Vector, frozenset[str], Any]]
+        ] = OrderedDict()
+
+        metrics.register_gauge(
+            "semantic_cache_entries",
+            lambda: sum(len(index) for index in self._indexes.values()),
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional["SemanticCache"]:
+        """Create the cache from the environment, or None if it is disabled.
+
+        The cache is enabled by default only with a sentence-transformers
+        model, the hashing embedder must be enabled explicitly.
+        """
+        model_name = os.getenv("SEMANTIC_CACHE_MODEL")
+        if model_name and SentenceTransformer is None:
+            print(
+                "Warning: SEMANTIC_CACHE_MODEL is set but 'sentence-transformers' is "
+                "not installed, using the hashing embedder"
+            )
+            model_name = None
+
+        enabled = os.getenv("SEMANTIC_CACHE_ENABLED") or (
+            "true" if model_name else "false"
+        )
+        if enabled.lower() not in ("1", "true", "yes"):
+            return None
+
+        if model_name:
+            embedder = SentenceTransformerEmbedder(model_name)
+            default_threshold = 0.9
+        else:
+            embedder = HashingEmbedder()
+            default_threshold = 0.8
+
+        return cls(
+            embedder,
+            threshold=float(
+                os.getenv("SEMANTIC_CACHE_THRESHOLD") or default_threshold
+            ),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 512)),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", 3600)),
+        )
+
+    def lookup(
+        self, namespace: tuple, question: str, data: Optional[str] = None
+    ) -> Optional[Any]:
+        """Get the value of the most similar earlier question above the threshold.
+
+        The data is the dataset of the question, which names its entities.
+        """
+        index = self._indexes.get(namespace)
+        if not index:
+            metrics.incr("semantic_cache_misses")
+            return None
+
+        now = time.time()
+        embedding = self.embedder.embed(question)
+        terms = key_terms(question, dataset_vocabulary(data))
+        best_score, best_value, near_miss = 0.0, None, False
+        for key, (expires_at, other, other_terms, value) in list(index.items()):
+            if expires_at < now:
+                del index[key]
+                continue
+            score = cosine(embedding, other)
+            if score < self.threshold or score <= best_score:
+                continue
+            if other_terms != terms:
+                near_miss = True
+                continue
+            best_score, best_value = score, value
+
+        if best_value is not None:
+            metrics.incr("semantic_cache_hits")
+            return best_value
+
+        if near_miss:
+            metrics.incr("semantic_cache_near_misses")
+
+        metrics.incr("semantic_cache_misses")
+        return None
+
+    def store(
+        self, namespace: tuple, question: str, value: Any, data: Optional[str] = None
+    ) -> None:
+        """Save the value generated for the question."""
+        index = self._indexes.get(namespace)
+        if index is None:
+            index = self._indexes[namespace] = OrderedDict()
+            while len(self._indexes) > self.max_namespaces:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(namespace)
+
+        index.pop(question, None)
+        index[question] = (
+            time.time() + self.ttl_seconds,
+            self.embedder.embed(question),
+            key_terms(question, dataset_vocabulary(data)),
+            value,
+        )
+        while len(index) > self.max_entries:
+            index.popitem(last=False)
@@ -0,0 +1,48 @@
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, Awaitable, Callable, TypeVar
+from core.metrics import metrics
+
+T = TypeVar("T")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase the text, collapse the whitespace and drop the trailing punctuation."""
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip().rstrip("?!.")
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Hash of the parts of a request which decide its result."""
+    serialized = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one call.
+
+    The first caller of a key starts the call, and the callers arriving while it
+    is in flight wait for it and share its result or its exception. The call is
+    shielded, so it keeps running for the others when one caller is cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task] = {}
+        metrics.register_gauge("single_flight_in_flight", lambda: len(self._calls))
+
+    async def do(self, kind: str, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, or wait for the call of the same kind and key in flight."""
+        call_key = f"{kind}:{key}"
+        task = self._calls.get(call_key)
+        if task is not None:
+            metrics.incr(f"single_flight_coalesced.{kind}")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._calls[call_key] = task
+        task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+        metrics.incr(f"single_flight_calls.{kind}")
+        return await asyncio.shield(task)
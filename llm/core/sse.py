@@ -0,0 +1,94 @@
+import json
+from typing import Any, AsyncIterator, Optional
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import AIMessageChunk
+from langchain_core.runnables.config import RunnableConfig
+from langgraph.graph.graph import CompiledGraph
+from pydantic import BaseModel
+
+# An event name and its JSON serializable data
+Event = tuple[str, Any]
+
+# Proxies must not buffer or cache the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_event(event: str, data: Any) -> str:
+    """Encode a Server-Sent Event."""
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _encode(events: AsyncIterator[Event]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_event(event, data)
+    except HTTPException as e:
+        yield format_event("error", {"status_code": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        yield format_event("error", {"status_code": 500, "detail": str(e)})
+        return
+    yield format_event("end", {})
+
+
+def sse_response(
+    events: AsyncIterator[Event], response: Optional[Response] = None
+) -> StreamingResponse:
+    """Stream the events to the client.
+
+    The headers set on the response of the endpoint by its dependencies, such
+    as the session id, are sent with the stream. The stream ends with an "end"
+    event, or with an "error" event when the generation fails after the
+    response has started.
+    """
+    headers = dict(response.headers) if response is not None else {}
+    headers.update(SSE_HEADERS)
+    return StreamingResponse(
+        _encode(events), media_type="text/event-stream", headers=headers
+    )
+
+
+class GraphRun:
+    """A streamed run of a graph, with its final state once the events are consumed.
+
+    The events are "node" when a node completes, with its duration when the node
+    is timed, and "token" for each chunk of text or structured output streamed
+    by the model of a node.
+    """
+
+    def __init__(
+        self, graph: CompiledGraph, input: dict, config: RunnableConfig
+    ) -> None:
+        self.graph = graph
+        self.input = input
+        self.config = config
+        self.values: dict = {}
+        # State update of the node of the last "node" event
+        self.last_update: dict = {}
+
+    async def events(self) -> AsyncIterator[Event]:
+        async for mode, chunk in self.graph.astream(
+            self.input,
+            config=self.config,
+            stream_mode=["updates", "messages", "values"],
+        ):
+            if mode == "values":
+                self.values = chunk
+            elif mode == "messages":
+                message, metadata = chunk
+                if isinstance(message, AIMessageChunk) and message.content:
+                    yield "token", {
+                        "node": metadata.get("langgraph_node"),
+                        "content": message.content,
+                    }
+            else:
+                for node, update in chunk.items():
+                    self.last_update = update or {}
+                    event = {"node": node}
+                    timings = (update or {}).get("node_timings") or {}
+                    if node in timings:
+                        event["ms"] = timings[node]
+                    yield "node", event
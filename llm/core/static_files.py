@@ -0,0 +1,51 @@
+import os
+import stat
+from mimetypes import guess_type
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles
+from core.compression import ENCODING_SUFFIXES, accepted_encodings
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files served with Cache-Control headers and precompressed variants.
+
+    Every artifact is written once under a unique key and never changes, so it
+    can be cached by the browser as immutable. When a precompressed variant of
+    the file exists (e.g. "index.html.br") and the client accepts its encoding,
+    the variant is served instead of the plain file.
+    """
+
+    cache_control = "public, max-age=31536000, immutable"
+
+    async def get_response(self, path: str, scope):
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if encoding not in accepted:
+                continue
+
+            full_path, stat_result = await anyio.to_thread.run_sync(
+                self.lookup_path, path + suffix
+            )
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                media_type = guess_type(os.path.basename(path))[0] or "text/plain"
+                return FileResponse(
+                    full_path,
+                    stat_result=stat_result,
+                    media_type=media_type,
+                    headers={
+                        "Content-Encoding": encoding,
+                        "Cache-Control": self.cache_control,
+                        "Vary": "Accept-Encoding",
+                    },
+                )
+
+        return await super().get_response(path, scope)
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
@@ -0,0 +1,274 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from pydantic import BaseModel, Field
+from core.common import PROJECT_ROOT
+from core.compression import ENCODING_SUFFIXES
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "r2")
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR") or os.path.join(
+    PROJECT_ROOT, "artifacts"
+)
+LOCAL_STORAGE_PUBLIC_URL = os.getenv(
+    "LOCAL_STORAGE_PUBLIC_URL", "http://localhost:8000/artifacts"
+)
+
+
+class StorageBackend(ABC):
+    """Backend which stores the artifact files and serves them on a public URL."""
+
+    @abstractmethod
+    async def put_object(
+        self,
+        key: str,
+        body: str | bytes,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        encodings: Optional[dict[str, bytes]] = None,
+    ) -> None:
+        """Store one object under the key.
+
+        encodings holds the precompressed variants of the body by content
+        encoding ("gzip", "br"), which the backend may store instead of or
+        next to the plain body.
+        """
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether an object is stored under the key."""
+
+    @abstractmethod
+    def public_url(self, key: str) -> str:
+        """Public URL of the object stored under the key."""
+
+    def close(self) -> None:
+        """Release the resources of the backend."""
+
+
+class R2Settings(BaseModel):
+    """Connection, retry and concurrency settings of the R2 object storage."""
+
+    public_url: str = Field(
+        default="https://pub-b348006f0b2142f7a105983d74576412.r2.dev",
+        description="Public URL of the bucket.",
+    )
+    max_pool_connections: int = Field(
+        default=32, description="Max open connections of the shared client."
+    )
+    upload_workers: int = Field(
+        default=16, description="Max uploads running at the same time."
+    )
+    max_attempts: int = Field(default=3, description="Max attempts per request.")
+    connect_timeout: float = Field(default=5.0, description="Connect timeout (s).")
+    read_timeout: float = Field(default=30.0, description="Read timeout (s).")
+
+    @classmethod
+    def from_env(cls) -> "R2Settings":
+        """Read the settings from the environment, falling back to the defaults."""
+        defaults = cls()
+        return cls(
+            public_url=os.getenv("CLOUDFLARE_R2_PUBLIC_URL", defaults.public_url),
+            max_pool_connections=int(
+                os.getenv("R2_MAX_POOL_CONNECTIONS", defaults.max_pool_connections)
+            ),
+            upload_workers=int(os.getenv("R2_UPLOAD_WORKERS", defaults.upload_workers)),
+            max_attempts=int(os.getenv("R2_MAX_ATTEMPTS", defaults.max_attempts)),
+            connect_timeout=float(
+                os.getenv("R2_CONNECT_TIMEOUT", defaults.connect_timeout)
+            ),
+            read_timeout=float(os.getenv("R2_READ_TIMEOUT", defaults.read_timeout)),
+        )
+
+
+class R2StorageBackend(StorageBackend):
+    """Cloudflare R2 object storage.
+
+    Holds a single pooled boto3 client, and the blocking uploads run on a bounded
+    thread pool, so they never stall the event loop.
+    """
+
+    def __init__(self, settings: R2Settings | None = None) -> None:
+        self.settings = settings or R2Settings()
+        self.bucket_name = os.getenv("CLOUDFLARE_R2_BUCKET_NAME")
+        self._client = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.upload_workers, thread_name_prefix="r2-upload"
+        )
+
+    def _get_client(self):
+        """Get the shared boto3 client, creating it on first use."""
+        if self._client is not None:
+            return self._client
+
+        # Cloudflare R2 Config
+        account_id = os.getenv("CLOUDFLARE_ACCOUNT_ID")
+        access_key_id = os.getenv("CLOUDFLARE_R2_ACCESS_KEY_ID")
+        secret_access_key = os.getenv("CLOUDFLARE_R2_SECRET_ACCESS_KEY")
+
+        if not all([account_id, access_key_id, secret_access_key]):
+            raise ValueError("Missing required Cloudflare R2 environment variables")
+
+        # Configure boto3 client for Cloudflare R2
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=f"https://{account_id}.r2.cloudflarestorage.com",
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=self.settings.max_pool_connections,
+                connect_timeout=self.settings.connect_timeout,
+                read_timeout=self.settings.read_timeout,
+                retries={"max_attempts": self.settings.max_attempts, "mode": "standard"},
+            ),
+            region_name="auto",
+        )
+        return self._client
+
+    async def put_object(
+        self,
+        key: str,
+        body: str | bytes,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        encodings: Optional[dict[str, bytes]] = None,
+    ) -> None:
+        extra_args = {"CacheControl": cache_control} if cache_control else {}
+
+        # Object storage can not negotiate the encoding, so the gzip variant is
+        # stored, which every browser accepts.
+        if encodings and "gzip" in encodings:
+            body = encodings["gzip"]
+            extra_args["ContentEncoding"] = "gzip"
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._executor,
+            partial(
+                self._get_client().put_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=body,
+                ContentType=content_type,
+                **extra_args,
+            ),
+        )
+
+    async def exists(self, key: str) -> bool:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._executor,
+                partial(
+                    self._get_client().head_object, Bucket=self.bucket_name, Key=key
+                ),
+            )
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+
+    def public_url(self, key: str) -> str:
+        return f"{self.settings.public_url}/{key}"
+
+    def close(self) -> None:
+        """Wait for running uploads and release the thread pool."""
+        self._executor.shutdown(wait=True)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Local directory which the API serves as static files.
+
+    Avoids the network round trip to the object storage in latency sensitive
+    deployments and benchmarks.
+    """
+
+    def __init__(self, root: str, base_url: str) -> None:
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def _write(self, key: str, body: str | bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first, so a half written file is never served
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body.encode("utf-8") if isinstance(body, str) else body)
+        os.replace(tmp_path, path)
+
+    async def put_object(
+        self,
+        key: str,
+        body: str | bytes,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        encodings: Optional[dict[str, bytes]] = None,
+    ) -> None:
+        # The precompressed variants are written next to the file, and picked
+        # by the static files handler from the Accept-Encoding of the client.
+        for encoding, encoded_body in (encodings or {}).items():
+            await asyncio.to_thread(
+                self._write, f"{key}{ENCODING_SUFFIXES[encoding]}", encoded_body
+            )
+        await asyncio.to_thread(self._write, key, body)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """Keeps the objects in memory. Used for tests and throughput benchmarks."""
+
+    def __init__(self, base_url: str = "memory://artifacts") -> None:
+        self.base_url = base_url
+        self.objects: dict[str, tuple[str | bytes, str]] = {}
+        self.encoded_objects: dict[str, dict[str, bytes]] = {}
+
+    async def put_object(
+        self,
+        key: str,
+        body: str | bytes,
+        content_type: str,
+        cache_control: Optional[str] = None,
+        encodings: Optional[dict[str, bytes]] = None,
+    ) -> None:
+        self.objects[key] = (body, content_type)
+        if encodings:
+            self.encoded_objects[key] = encodings
+
+    async def exists(self, key: str) -> bool:
+        return key in self.objects
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def get_object(self, key: str) -> Optional[tuple[str | bytes, str]]:
+        return self.objects.get(key)
+
+
+def create_storage_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    """Create the storage backend selected by the STORAGE_BACKEND setting."""
+    if name == "r2":
+        return R2StorageBackend(R2Settings.from_env())
+    if name == "local":
+        return LocalStorageBackend(LOCAL_STORAGE_DIR, LOCAL_STORAGE_PUBLIC_URL)
+    if name == "memory":
+        return InMemoryStorageBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
@@ -1,3 +1,5 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.endpoints import rechart
@@ -5,8 +7,103 @@ from api.endpoints import component
 from api.endpoints import ui_component
 from api.endpoints import iframe_component
 from api.endpoints import dashboard
+from api.endpoints import metrics
+from api.endpoints import jobs
+from agents.component_agent import ComponentAgent
+from agents.dashboard_agent import DashboardAgent
+from agents.iframe_component_agent import IframeComponentAgent
+from agents.ui_component_agent import UiComponentAgent
+from core.graph_registry import GraphRegistry
+from core.layout_store import LayoutStore
+from core.llm_cache import (
+    LLM_CACHE_EXCLUDE_PATHS,
+    LLMCacheBypassMiddleware,
+    TieredLLMCache,
+)
+from core.llm_client import LLMClientRegistry, LLMClientSettings
+from core.admission import AdmissionController
+from core.artifact_storage import ArtifactStorage
+from core.assets import create_asset_registry
+from core.background_tasks import BackgroundTaskStore
+from core.compaction import count_tokens
+from core.component_classifier import ComponentTypeClassifier
+from core.component_library import ComponentLibrary
+from core.datasets import create_dataset_catalog
+from core.jobs import JobManager
+from core.semantic_cache import SemanticCache
+from core.single_flight import SingleFlight
+from core.static_files import CachedStaticFiles
+from core.storage_backends import (
+    LOCAL_STORAGE_DIR,
+    STORAGE_BACKEND,
+    create_storage_backend,
+)
+
+
+def warm_up_graphs(app: FastAPI) -> None:
+    """Build and compile every agent workflow before the first request."""
+    try:
+        client = app.state.llm_clients.get()
+    except ValueError as e:
+        print(f"Skipping graph warm-up: {e}")
+        return
+
+    for agent in (ComponentAgent, DashboardAgent, IframeComponentAgent):
+        agent(client, app.state.graphs)
+    UiComponentAgent(
+        client,
+        app.state.graphs,
+        semantic_cache=app.state.semantic_cache,
+        suggestions=app.state.suggestions,
+        classifier=app.state.component_classifier,
+        component_library=app.state.component_library,
+    )
 
-app = FastAPI()
+    for name, seconds in app.state.graphs.build_times.items():
+        print(f"Compiled '{name}' graph in {seconds * 1000:.1f} ms")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the process-wide resources on startup and release them on shutdown."""
+    app.state.llm_clients = LLMClientRegistry(
+        LLMClientSettings.from_env(), cache=TieredLLMCache.from_env()
+    )
+    app.state.graphs = GraphRegistry()
+    app.state.layouts = LayoutStore.from_env()
+    app.state.assets = create_asset_registry()
+    app.state.datasets = create_dataset_catalog()
+    app.state.component_library = ComponentLibrary(app.state.assets)
+    app.state.semantic_cache = SemanticCache.from_env()
+    app.state.single_flight = SingleFlight()
+    app.state.component_classifier = ComponentTypeClassifier.from_env()
+    app.state.suggestions = BackgroundTaskStore(
+        "suggestions", ttl_seconds=float(os.getenv("SUGGESTIONS_TTL_SECONDS", 600))
+    )
+    app.state.speculative_finals = BackgroundTaskStore(
+        "speculative_finals",
+        ttl_seconds=float(os.getenv("SPECULATIVE_FINAL_TTL_SECONDS", 300)),
+    )
+    app.state.artifact_storage = ArtifactStorage(
+        create_storage_backend(),
+        design_system_css=app.state.assets.prompt("design_system"),
+    )
+    app.state.admission = AdmissionController.from_env()
+    app.state.jobs = JobManager.from_env(admission=app.state.admission)
+    app.state.jobs.start()
+    warm_up_graphs(app)
+    # Load the tokenizer of the dataset compaction before the first request
+    count_tokens("")
+    yield
+    await app.state.jobs.aclose()
+    app.state.suggestions.close()
+    app.state.speculative_finals.close()
+    app.state.artifact_storage.close()
+    app.state.layouts.close()
+    await app.state.llm_clients.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["http://localhost:3000", "http://localhost:4200"]
 
@@ -16,10 +113,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Id"],
 )
+app.add_middleware(LLMCacheBypassMiddleware, exclude_paths=LLM_CACHE_EXCLUDE_PATHS)
 
 app.include_router(rechart.router, prefix="/rechart", tags=["Chart Generation"])
 app.include_router(component.router, prefix="/component", tags=["Component Generation"])
 app.include_router(ui_component.router, prefix="/ui_component", tags=["UI Component"])
 app.include_router(iframe_component.router, prefix="/iframe", tags=["UI Component"])
 app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+
+# Artifacts of the local storage backend are served by the API itself
+if STORAGE_BACKEND == "local":
+    app.mount(
+        "/artifacts",
+        CachedStaticFiles(directory=LOCAL_STORAGE_DIR, check_dir=False),
+        name="artifacts",
+    )
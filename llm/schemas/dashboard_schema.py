@@ -1,4 +1,4 @@
-from typing import List, Optional, TypedDict
+from typing import Annotated, List, Optional, TypedDict
 from pydantic import BaseModel, Field
 
 
@@ -7,10 +7,20 @@ class LayoutRequestSchema(BaseModel):
 
     query: str = Field(description="User query.")
     data: str = Field(description="Provided dataset by the user.")
+    dataset_id: Optional[str] = Field(
+        default=None,
+        description="Id of the dataset of the catalog to use. The default dataset is used when not set.",
+    )
     phase: str = Field(
         default="layout",
         description="Phase identifier for the nodes of the Agent. Either 'layout' or 'final'",
     )
+    first_n: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=3,
+        description="Return the first N finished layouts and cancel the others. Every layout is returned when not set.",
+    )
 
 
 class FinalRequestSchema(BaseModel):
@@ -52,18 +62,21 @@ class Layout(BaseModel):
     js: str
 
 
-class LayoutNode(BaseModel):
-    """Schema for the Layout generation node of the Agent workflow."""
-
-    layouts: List[Layout] = Field(description="Three layouts.")
-
-
 class FinalNode(BaseModel):
     """Schema for the final generation node of the Agent workflow."""
 
     layout: Layout
 
 
+def merge_layouts(
+    current: Optional[List[Layout]], update: Optional[List[Layout]]
+) -> List[Layout]:
+    """Collect the layouts generated by the concurrent nodes. None resets them."""
+    if update is None:
+        return []
+    return (current or []) + update
+
+
 class AgentState(TypedDict):
     """State schema of the Agent workflow."""
 
@@ -77,5 +90,8 @@ class AgentState(TypedDict):
         description="Phase identifier for the nodes of the Agent. Either 'layout' or 'final'"
     )
     selected_layout: Layout = Field(description="Selected layout by the user.")
-    layouts: List[Layout] = Field(description="The three layouts for service.")
+    layout_index: int = Field(description="Index of the layout a node generates.")
+    layouts: Annotated[List[Layout], merge_layouts] = Field(
+        description="The three layouts for service."
+    )
     final: Layout = Field(description="Final layout for service.")
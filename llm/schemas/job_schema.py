@@ -0,0 +1,30 @@
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobSchema(BaseModel):
+    """Schema of a generation job and its result."""
+
+    id: str
+    kind: str = Field(description="Generation of the job, e.g. 'ui_component'.")
+    status: JobStatus
+    created_at: float = Field(description="Unix time of the submission.")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Any] = Field(
+        default=None,
+        description="Response of the generation endpoint, once the job succeeded.",
+    )
+    error: Optional[str] = Field(
+        default=None, description="Error message, when the job failed."
+    )
+
+
+class JobSubmittedSchema(BaseModel):
+    """Schema for the response of a job submission."""
+
+    id: str
+    status: JobStatus
+    status_url: str = Field(description="URL to poll for the status and result.")
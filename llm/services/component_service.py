@@ -16,7 +16,7 @@ class ComponentService:
         self.agent = agent
 
     async def generate_ui_component(
-        self, request: ComponentRequestSchema
+        self, request: ComponentRequestSchema, session_id: str
     ) -> ComponentResponseSchema:
         try:
             data = get_data(self.data_path)
@@ -25,7 +25,7 @@ class ComponentService:
 
         try:
             component_response = await self.agent.generate_ui_component(
-                question=request.prompt, data=data
+                question=request.prompt, data=data, session_id=session_id
             )
             return component_response
         except Exception as e:
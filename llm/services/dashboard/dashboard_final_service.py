@@ -1,9 +1,23 @@
-import json
+import asyncio
 import os
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import Depends, HTTPException
 from agents.dashboard_agent import DashboardAgent
-from core.store_to_r2 import R2ObjectStorage
+from core.assets import AssetRegistry
+from core.admission import AdmissionController
+from core.common import (
+    get_admission,
+    get_artifact_storage,
+    get_asset_registry,
+    get_component_library,
+    get_layout_store,
+    get_speculative_finals,
+)
+from core.background_tasks import BackgroundTaskStore
+from core.component_library import ComponentLibrary
+from core.metrics import metrics
+from core.layout_store import LayoutStore
+from core.artifact_storage import ArtifactStorage
 from schemas.dashboard_schema import (
     AgentState,
     FinalRequestSchema,
@@ -12,6 +26,10 @@ from schemas.dashboard_schema import (
 )
 from langchain_core.runnables.config import RunnableConfig
 
+# Number of layouts of each generation, the first ones to be ready, whose final
+# dashboard is generated before the user chooses. 0 disables the speculation.
+SPECULATIVE_FINAL_LAYOUTS = int(os.getenv("SPECULATIVE_FINAL_LAYOUTS", 0))
+
 
 class DashboardFinalService:
     """Service for interacting with Dashboard Agent for final dashboard."""
@@ -19,95 +37,106 @@ class DashboardFinalService:
     def __init__(
         self,
         agent: Annotated[DashboardAgent, Depends()],
-        r2: Annotated[
-            R2ObjectStorage,
-            Depends(
-                lambda: R2ObjectStorage(
-                    "https://pub-b348006f0b2142f7a105983d74576412.r2.dev"
-                )
-            ),
+        storage: Annotated[ArtifactStorage, Depends(get_artifact_storage)],
+        layouts: Annotated[LayoutStore, Depends(get_layout_store)],
+        assets: Annotated[AssetRegistry, Depends(get_asset_registry)],
+        component_library: Annotated[
+            ComponentLibrary, Depends(get_component_library)
         ],
+        speculative_finals: Annotated[
+            BackgroundTaskStore, Depends(get_speculative_finals)
+        ],
+        admission: Annotated[
+            Optional[AdmissionController], Depends(get_admission)
+        ] = None,
     ):
         self.agent = agent
-        self.r2 = r2
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(
-                current_dir, "..", "..", "public-mock-data", "technova_dummy_data.json"
-            )
-            with open(file_path, "r") as f:
-                self.data = json.dumps(json.load(f))
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            raise RuntimeError(
-                f"Final service -> Failed to load or parse technova_dummy_data.json: {e}"
-            )
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(
-                current_dir, "..", "..", "public-mock-data", "component_library.json"
-            )
-            with open(file_path, "r") as f:
-                self.ui_descriptor = json.dumps(json.load(f))
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            raise RuntimeError(
-                f"Final service -> Failed to load or parse component_library.json: {e}"
-            )
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(
-                current_dir, "..", "..", "public-mock-data", "styles.css"
-            )
-            with open(file_path, "r") as f:
-                self.css_descriptor = f.read()
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            raise RuntimeError(
-                f"Final service -> Failed to load or parse styles.css: {e}"
-            )
+        self.storage = storage
+        self.layouts = layouts
+        self.component_library = component_library
+        self.speculative_finals = speculative_finals
+        self.admission = admission
+        self.css_descriptor = assets.prompt("design_system")
 
-    async def generate_final(self, request: FinalRequestSchema) -> FinalResponseSchema:
-        config = RunnableConfig(configurable={"thread_id": "1"})
-
-        # Get previous state
-        selected_layout: Layout = None
-        try:
-            checkpoints = []
-            for checkpoint in self.agent.graph.checkpointer.list(config):
-                checkpoints.append(checkpoint)
-
-            if checkpoints:
-                latest_checkpoint = max(
-                    checkpoints, key=lambda x: x.metadata.get("step", 0)
-                )
-                previous_state = latest_checkpoint.checkpoint["channel_values"]
-                layouts = previous_state.get("layouts", [])
-
-                # Find the layout with matching layout_id
-                for layout in layouts:
-                    if layout.layout_id == request.layout_id:
-                        selected_layout = layout
-                        break
-
-                if not selected_layout:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Final service -> Layout with id '{request.layout_id}' not found in conversation history",
-                    )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Final service -> failed to retrieve conv. history: {e}",
-            )
+    async def _finalize(self, layout: Layout, thread_id: str) -> Layout:
+        """Generate the final dashboard of the layout."""
+        config = RunnableConfig(configurable={"thread_id": thread_id})
 
         # TODO: if the results are not great, then append "query" and "data"
         initial_state: AgentState = {
-            "phase": request.phase,
-            "selected_layout": selected_layout,
-            "ui_descriptor": self.ui_descriptor,
+            "phase": "final",
+            "selected_layout": layout,
+            "ui_descriptor": self.component_library.select(
+                f"{layout.page_title} {layout.html}",
+                "dashboard",
+            ),
             "design_system": self.css_descriptor,
         }
 
         result = await self.agent.graph.ainvoke(initial_state, config=config)
-        final_result: Layout = result["final"]
+        return result["final"]
+
+    def speculate(self, session_id: str, layout: Layout) -> None:
+        """Start generating the final dashboard of the layout in the background.
+
+        The user is still choosing a layout, so the final dashboard of the
+        chosen one can be ready when the choice arrives. Each speculation runs
+        in its own thread of the checkpointer. Each one holds a batch slot of
+        the admission control, and is skipped when no slot is free.
+        """
+        if self.admission is not None and not self.admission.try_acquire(
+            "dashboard_final", "batch"
+        ):
+            metrics.incr("speculative_final_skipped")
+            return
+
+        task = self.speculative_finals.start(
+            f"{session_id}:{layout.layout_id}",
+            self._finalize(layout, f"{session_id}:speculative:{layout.layout_id}"),
+        )
+        if self.admission is not None:
+            # Also given back when the task is cancelled before it starts
+            admission = self.admission
+            task.add_done_callback(lambda _: admission.release("dashboard_final"))
+
+    async def _speculative_result(
+        self, session_id: str, layout_id: str
+    ) -> Optional[Layout]:
+        """Final dashboard generated speculatively for the chosen layout, if any.
+
+        The speculations of the other layouts of the session are cancelled.
+        """
+        task = self.speculative_finals.pop(f"{session_id}:{layout_id}")
+        self.speculative_finals.cancel_prefix(f"{session_id}:")
+        if task is None:
+            metrics.incr("speculative_final_misses")
+            return None
+
+        try:
+            # Shielded, so a client which disconnects does not cancel the task
+            final_result = await asyncio.shield(task)
+        except Exception as e:
+            print(f"Speculative final dashboard failed, generating it again: {e}")
+            metrics.incr("speculative_final_failures")
+            return None
+
+        metrics.incr("speculative_final_hits")
+        return final_result
+
+    async def generate_final(
+        self, request: FinalRequestSchema, session_id: str
+    ) -> FinalResponseSchema:
+        # Get the selected layout of the session
+        selected_layout: Layout = self.layouts.get(session_id, request.layout_id)
+        if not selected_layout:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Final service -> Layout with id '{request.layout_id}' not found for this session",
+            )
+
+        final_result = await self._speculative_result(session_id, request.layout_id)
+        if final_result is None:
+            final_result = await self._finalize(selected_layout, session_id)
 
         response: FinalResponseSchema = None
         try:
@@ -118,12 +147,12 @@ class DashboardFinalService:
                 "js": final_result.js,
             }
 
-            hosted_url = await self.r2.upload_to_storage(files_obj)
+            hosted_url = await self.storage.upload_to_storage(files_obj)
             response = FinalResponseSchema(url=hosted_url)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Final service -> Failed to upload to R2 object storage: {e}",
+                detail=f"Final service -> Failed to upload to storage: {e}",
             )
 
         try:
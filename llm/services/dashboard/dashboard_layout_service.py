@@ -1,9 +1,24 @@
-import json
-import os
-from typing import Annotated, List
+import asyncio
+from typing import Annotated, AsyncIterator, List, Optional, Tuple
 from fastapi import Depends, HTTPException
 from agents.dashboard_agent import DashboardAgent
-from core.store_to_r2 import R2ObjectStorage
+from services.dashboard.dashboard_final_service import (
+    SPECULATIVE_FINAL_LAYOUTS,
+    DashboardFinalService,
+)
+from core.common import (
+    get_artifact_storage,
+    get_dataset_catalog,
+    get_layout_store,
+    get_single_flight,
+)
+from core.datasets import DatasetCatalog
+from core.metrics import metrics
+from core.semantic_cache import dataset_fingerprint
+from core.single_flight import SingleFlight, normalize_text, request_fingerprint
+from core.layout_store import LayoutStore
+from core.artifact_storage import ArtifactStorage
+from core.sse import Event, GraphRun
 from schemas.dashboard_schema import (
     AgentState,
     Layout,
@@ -14,74 +29,204 @@ from schemas.dashboard_schema import (
 from langchain_core.runnables.config import RunnableConfig
 
 
+# Internal events of the layout generation
+_GENERATED = "generated"
+_FAILED = "failed"
+
+
 class DashboardLayoutService:
     """Service for interacting with Dashboard Agent for three layouts."""
 
     def __init__(
         self,
         agent: Annotated[DashboardAgent, Depends()],
-        r2: Annotated[
-            R2ObjectStorage,
-            Depends(
-                lambda: R2ObjectStorage(
-                    "https://pub-b348006f0b2142f7a105983d74576412.r2.dev"
-                )
-            ),
-        ],
+        storage: Annotated[ArtifactStorage, Depends(get_artifact_storage)],
+        layouts: Annotated[LayoutStore, Depends(get_layout_store)],
+        datasets: Annotated[DatasetCatalog, Depends(get_dataset_catalog)],
+        single_flight: Annotated[SingleFlight, Depends(get_single_flight)],
+        final: Annotated[DashboardFinalService, Depends()],
     ):
         self.agent = agent
-        self.r2 = r2
+        self.storage = storage
+        self.layouts = layouts
+        self.datasets = datasets
+        self.single_flight = single_flight
+        self.final = final
+
+    def _dataset(self, request: LayoutRequestSchema) -> str:
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(
-                current_dir, "..", "..", "public-mock-data", "technova_dummy_data.json"
-            )
-            with open(file_path, "r") as f:
-                self.data = json.dumps(json.load(f))
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            raise RuntimeError(
-                f"Layout service -> Failed to load or parse technova_dummy_data.json: {e}"
+            return self.datasets.prompt(request.dataset_id)
+        except KeyError as e:
+            raise HTTPException(
+                status_code=404, detail=f"Layout service -> {e.args[0]}"
             )
 
     async def generate_layouts(
-        self, request: LayoutRequestSchema
+        self, request: LayoutRequestSchema, session_id: str
     ) -> LayoutResponseSchema:
-        config = RunnableConfig(configurable={"thread_id": "1"})
-
-        initial_state: AgentState = {
-            "query": request.query,
-            "data": self.data,
-            "phase": request.phase,  # "layout"
-        }
+        data = self._dataset(request)
 
-        result = await self.agent.graph.ainvoke(initial_state, config=config)
-        response_layouts: List[Layout] = result["layouts"]
+        # Identical requests in flight share one generation, even across sessions,
+        # since every caller saves the layouts in its own session below.
+        key = request_fingerprint(
+            normalize_text(request.query), dataset_fingerprint(data), request.first_n
+        )
+        generated = await self.single_flight.do(
+            "dashboard_layouts",
+            key,
+            lambda: self._generate_and_upload(
+                request.query, data, session_id, request.first_n
+            ),
+        )
 
         layouts_response_list: List[LayoutsResponse] = []
+        for index, (layout, hosted_url) in enumerate(generated):
+            self._save(session_id, layout, index)
+            layout_response = LayoutsResponse(url=hosted_url, layout_id=layout.layout_id)
+            layouts_response_list.append(layout_response)
+
         try:
-            for layout in response_layouts:
-                files_obj = {
-                    "page_title": layout.page_title,
-                    "html": layout.html,
-                    "css": layout.css,
-                    "js": layout.js,
-                }
-                hosted_url = await self.r2.upload_to_storage(files_obj)
-                layout_response = LayoutsResponse(
-                    url=hosted_url, layout_id=layout.layout_id
-                )
-                layouts_response_list.append(layout_response)
+            if layouts_response_list:
+                return LayoutResponseSchema(layouts=layouts_response_list)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Layout service -> Failed to upload to R2 object storage: {e}",
+                detail=f"Layout service -> Failed to return response: {e}",
             )
 
+    async def stream_layouts(
+        self, request: LayoutRequestSchema, session_id: str
+    ) -> AsyncIterator[Event]:
+        """Generate the layouts, streaming the progress of the generation.
+
+        The request is validated before the stream starts. A "layout" event is
+        sent as soon as each layout is generated and uploaded.
+        """
+        data = self._dataset(request)
+        return self._stream_events(request.query, data, session_id, request.first_n)
+
+    def _save(self, session_id: str, layout: Layout, index: int) -> None:
+        """Save the layout of the session, the index-th to be ready.
+
+        The final dashboard of the first layouts is generated speculatively
+        while the user chooses.
+        """
+        self.layouts.put(session_id, layout)
+        if index < SPECULATIVE_FINAL_LAYOUTS:
+            self.final.speculate(session_id, layout)
+
+    @staticmethod
+    def _initial_state(query: str, data: str) -> AgentState:
+        return {
+            "query": query,
+            "data": data,
+            "phase": "layout",
+            "layouts": None,
+        }
+
+    async def _upload(self, layout: Layout) -> str:
         try:
-            if layouts_response_list:
-                return LayoutResponseSchema(layouts=layouts_response_list)
+            return await self.storage.upload_to_storage(
+                {
+                    "page_title": layout.page_title,
+                    "html": layout.html,
+                    "css": layout.css,
+                    "js": layout.js,
+                },
+                link_design_system=False,
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Layout service -> Failed to return response: {e}",
+                detail=f"Layout service -> Failed to upload to storage: {e}",
+            )
+
+    async def _generate_and_upload(
+        self, query: str, data: str, session_id: str, first_n: Optional[int] = None
+    ) -> List[Tuple[Layout, str]]:
+        """Generate the layouts and upload them, returning their hosted URLs."""
+        return [
+            payload
+            async for event, payload in self._layout_events(
+                query, data, session_id, first_n
             )
+            if event == "uploaded"
+        ]
+
+    async def _stream_events(
+        self, query: str, data: str, session_id: str, first_n: Optional[int]
+    ) -> AsyncIterator[Event]:
+        uploaded = 0
+        async for event, payload in self._layout_events(
+            query, data, session_id, first_n
+        ):
+            if event == "uploaded":
+                layout, hosted_url = payload
+                self._save(session_id, layout, uploaded)
+                uploaded += 1
+                yield "layout", LayoutsResponse(
+                    url=hosted_url, layout_id=layout.layout_id
+                )
+            else:
+                yield event, payload
+
+    async def _layout_events(
+        self, query: str, data: str, session_id: str, first_n: Optional[int]
+    ) -> AsyncIterator[Event]:
+        """Generate the layouts concurrently and upload each one as soon as it is ready.
+
+        The events of the graph are followed by an "uploaded" event with the
+        layout and its hosted URL for each uploaded layout, in completion order.
+        With first_n, the generation and the uploads of the other layouts are
+        cancelled once the first N layouts are uploaded.
+        """
+        config = RunnableConfig(configurable={"thread_id": session_id})
+        run = GraphRun(self.agent.graph, self._initial_state(query, data), config)
+
+        # Events of the graph and of the uploads, in the order they happen
+        events: asyncio.Queue = asyncio.Queue()
+        uploads: List[asyncio.Task] = []
+
+        async def upload(layout: Layout) -> None:
+            try:
+                await events.put(("uploaded", (layout, await self._upload(layout))))
+            except Exception as e:
+                await events.put((_FAILED, e))
+
+        async def generate() -> None:
+            try:
+                async for event in run.events():
+                    await events.put(event)
+                    if event[0] == "node":
+                        for layout in run.last_update.get("layouts") or []:
+                            uploads.append(asyncio.create_task(upload(layout)))
+            except Exception as e:
+                await events.put((_FAILED, e))
+            else:
+                await events.put((_GENERATED, None))
+
+        generation = asyncio.create_task(generate())
+        generating = True
+        uploaded = 0
+        try:
+            # Every upload is started before the end of the generation is queued
+            while generating or uploaded < len(uploads):
+                event, payload = await events.get()
+                if event == _FAILED:
+                    raise payload
+                if event == _GENERATED:
+                    generating = False
+                    continue
+
+                yield event, payload
+                if event == "uploaded":
+                    uploaded += 1
+                    if first_n and uploaded >= first_n:
+                        break
+        finally:
+            # Done, or the client disconnected or a step failed
+            stragglers = [t for t in [generation, *uploads] if not t.done()]
+            for task in stragglers:
+                task.cancel()
+            if first_n and stragglers:
+                metrics.incr("dashboard_layouts_first_n_cancelled")
@@ -1,35 +1,39 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, AsyncIterator, Optional
 from fastapi import Depends, HTTPException
+from core.assets import AssetRegistry
+from core.background_tasks import BackgroundTaskStore
+from core.common import get_asset_registry, get_single_flight, get_suggestion_store
+from core.semantic_cache import dataset_fingerprint
+from core.single_flight import SingleFlight, normalize_text, request_fingerprint
+from core.sse import Event
 from agents.ui_component_agent import (
+    PromptSuggestionsResponseSchema,
     UiComponentAgent,
     UiComponentRequestSchema,
     UiComponentResponseSchema,
 )
-import json
-import os
 import base64
 
 
 class UiComponentService:
     """Service for interacting with the UiComponent Agent."""
 
-    def __init__(self, agent: Annotated[UiComponentAgent, Depends()]):
+    def __init__(
+        self,
+        agent: Annotated[UiComponentAgent, Depends()],
+        assets: Annotated[AssetRegistry, Depends(get_asset_registry)],
+        single_flight: Annotated[SingleFlight, Depends(get_single_flight)],
+        suggestions: Annotated[BackgroundTaskStore, Depends(get_suggestion_store)],
+    ):
         self.agent = agent
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            file_path = os.path.join(
-                current_dir, "..", "public-mock-data", "component_library.json"
-            )
-            with open(file_path, "r") as f:
-                component_data = json.load(f)
-            self.component_descriptors = json.dumps(component_data)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            raise RuntimeError(f"Failed to load or parse component_library.json: {e}")
+        self.single_flight = single_flight
+        self.suggestions = suggestions
+        self.component_descriptors = assets.prompt("component_library")
 
-    async def generate_ui_component(
-        self, request: UiComponentRequestSchema
-    ) -> UiComponentResponseSchema:
-        """Generate a UI component based on the user's request."""
+    def _decode_dataset(self, request: UiComponentRequestSchema) -> Optional[str]:
+        """Dataset of the request, decoded from base64."""
+        data = None
         if request.dataset and request.dataset_name:
             try:
                 decoded_bytes = base64.b64decode(request.dataset)
@@ -44,15 +48,72 @@ class UiComponentService:
             raise HTTPException(
                 status_code=500, detail="There is no data and UI descriptor set."
             )
+        return data
+
+    async def generate_ui_component(
+        self, request: UiComponentRequestSchema, session_id: str
+    ) -> UiComponentResponseSchema:
+        """Generate a UI component based on the user's request."""
+        data = self._decode_dataset(request)
+
+        # Identical requests of the session in flight share one generation. The
+        # session is part of the key because the component joins its history.
+        key = request_fingerprint(
+            session_id, normalize_text(request.prompt), dataset_fingerprint(data)
+        )
 
         try:
-            component_response = await self.agent.generate_ui_component(
-                question=request.prompt,
-                data=data,
-                component_descriptors=self.component_descriptors,
+            component_response = await self.single_flight.do(
+                "ui_component",
+                key,
+                lambda: self.agent.generate_ui_component(
+                    question=request.prompt,
+                    data=data,
+                    session_id=session_id,
+                    component_descriptors=self.component_descriptors,
+                ),
             )
             return component_response
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Error while generating component: {e}"
             )
+
+    async def stream_ui_component(
+        self, request: UiComponentRequestSchema, session_id: str
+    ) -> AsyncIterator[Event]:
+        """Generate a UI component, streaming the progress of the generation.
+
+        The request is validated before the stream starts. Streamed generations
+        are not coalesced, since every client receives its own events.
+        """
+        data = self._decode_dataset(request)
+        return self.agent.stream_ui_component(
+            question=request.prompt,
+            data=data,
+            session_id=session_id,
+            component_descriptors=self.component_descriptors,
+        )
+
+    async def get_prompt_suggestions(
+        self, component_id: str
+    ) -> PromptSuggestionsResponseSchema:
+        """Wait for the prompt suggestions generated for the component."""
+        task = self.suggestions.get(component_id)
+        if task is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No prompt suggestions for component '{component_id}'",
+            )
+
+        try:
+            # Shielded, so a client which disconnects does not cancel the task
+            result = await asyncio.shield(task)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Failed to generate prompt suggestions: {e}"
+            )
+
+        return PromptSuggestionsResponseSchema(
+            id=component_id, suggestions=result.suggestions
+        )
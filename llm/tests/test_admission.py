@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from core.admission import AdmissionController
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_saturated_endpoint_does_not_block_other_endpoints():
+    async def scenario():
+        admission = AdmissionController(
+            max_concurrent=16,
+            endpoint_limits={"dashboard_final": 1},
+            max_queued=1,
+            queue_timeout=0.1,
+        )
+        async with admission.admit("dashboard_final"):
+            # A higher priority waiter, blocked by the limit of its endpoint
+            queued = asyncio.create_task(
+                admission.admit("dashboard_final").__aenter__()
+            )
+            await asyncio.sleep(0)
+            assert len(admission._waiters) == 1
+
+            # The queue is full, but the other endpoint has free capacity
+            async with admission.admit("ui_component"):
+                assert admission.active == 2
+
+            with pytest.raises(HTTPException):
+                await queued
+
+    run(scenario())
+
+
+def test_queue_full_is_rejected_with_retry_after():
+    async def scenario():
+        admission = AdmissionController(
+            max_concurrent=1, max_queued=1, queue_timeout=1, retry_after=5
+        )
+        async with admission.admit("rechart"):
+            queued = asyncio.create_task(admission.admit("rechart").__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as rejected:
+                async with admission.admit("rechart"):
+                    pass
+            assert rejected.value.status_code == 503
+            assert rejected.value.headers["Retry-After"] == "5"
+        await queued
+        assert admission.active == 1
+
+    run(scenario())
+
+
+def test_final_and_interactive_requests_go_first():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, queue_timeout=1)
+        order = []
+
+        async def request(endpoint, priority_class):
+            async with admission.admit(endpoint, priority_class):
+                order.append((endpoint, priority_class))
+
+        async with admission.admit("rechart"):
+            tasks = []
+            for endpoint, priority_class in [
+                ("rechart", "batch"),
+                ("dashboard_layouts", "interactive"),
+                ("dashboard_final", "interactive"),
+            ]:
+                tasks.append(asyncio.create_task(request(endpoint, priority_class)))
+                await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        assert order == [
+            ("dashboard_final", "interactive"),
+            ("dashboard_layouts", "interactive"),
+            ("rechart", "batch"),
+        ]
+
+    run(scenario())
+
+
+def test_try_acquire_does_not_wait():
+    async def scenario():
+        admission = AdmissionController(
+            max_concurrent=16, endpoint_limits={"dashboard_final": 1}
+        )
+        assert admission.try_acquire("dashboard_final")
+        assert not admission.try_acquire("dashboard_final")
+        admission.release("dashboard_final")
+        assert admission.active == 0
+
+    run(scenario())
@@ -0,0 +1,24 @@
+import logging
+from core.checkpointer import BoundedMemorySaver
+from schemas.dashboard_schema import Layout
+
+LAYOUT = Layout(layout_id="layout-1", page_title="Sales", html="<div></div>", css="", js="")
+
+
+def round_trip(saver, value):
+    return saver.serde.loads_typed(saver.serde.dumps_typed(value))
+
+
+def test_allowed_types_are_loaded_without_warning(caplog):
+    saver = BoundedMemorySaver(allowed_types=(Layout,))
+    with caplog.at_level(logging.WARNING):
+        state = round_trip(saver, {"layouts": [LAYOUT], "final": LAYOUT})
+
+    assert state == {"layouts": [LAYOUT], "final": LAYOUT}
+    assert not caplog.records
+
+
+def test_other_types_are_not_loaded():
+    state = round_trip(BoundedMemorySaver(), {"final": LAYOUT})
+
+    assert not isinstance(state["final"], Layout)
@@ -0,0 +1,33 @@
+import pytest
+from core.component_classifier import ComponentTypeClassifier
+
+
+@pytest.fixture
+def classifier():
+    return ComponentTypeClassifier()
+
+
+@pytest.mark.parametrize(
+    "question, component_type",
+    [
+        ("Show a bar chart of the revenue by month", "chart"),
+        ("Plot the cholesterol over time", "chart"),
+        ("Create a table of the products", "ui"),
+        ("Show the patient summary as cards", "ui"),
+    ],
+)
+def test_keywords_decide(classifier, question, component_type):
+    assert classifier.classify(question) == component_type
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What is the total revenue?",
+        "What is the total cholesterol?",
+        "What is the latest LDL value compared to its reference range?",
+        "Show a table next to a chart of the revenue",
+    ],
+)
+def test_unclear_questions_are_left_to_the_llm(classifier, question):
+    assert classifier.classify(question) is None
@@ -0,0 +1,66 @@
+import pytest
+from core.semantic_cache import HashingEmbedder, SemanticCache
+
+NAMESPACE = ("ui_component", "dataset", "table")
+
+DATA = (
+    '{"departments":[{"departmentName":"Engineering","headcount":40},'
+    '{"departmentName":"Sales","headcount":25}],"products":[{"name":"Laptop",'
+    '"revenue":1200,"churn":0.1,"shipped":true}]}'
+)
+
+NEAR_MISSES = [
+    ("Show the products sorted by revenue ascending", "Show the products sorted by revenue descending"),
+    ("Show the revenue for 2023", "Show the revenue for 2024"),
+    ("Customers with churn above 10 percent", "Customers with churn below 10 percent"),
+    ("Headcount of the engineering department", "Headcount of the sales department"),
+    ("Orders which are shipped", "Orders which are not shipped"),
+]
+
+REPHRASINGS = [
+    ("show revenue by product", "revenue per product chart"),
+    ("Show the revenue by region", "revenue by region"),
+    ("Can you show me the orders per customer", "Orders per customer please"),
+]
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(HashingEmbedder(), threshold=0.8)
+
+
+@pytest.mark.parametrize("stored, asked", NEAR_MISSES)
+def test_near_miss_is_not_a_hit(cache, stored, asked):
+    cache.store(NAMESPACE, stored, "stored result", DATA)
+
+    assert cache.lookup(NAMESPACE, asked, DATA) is None
+
+
+@pytest.mark.parametrize("stored, asked", REPHRASINGS)
+def test_rephrasing_is_a_hit(cache, stored, asked):
+    cache.store(NAMESPACE, stored, "stored result", DATA)
+
+    assert cache.lookup(NAMESPACE, asked, DATA) == "stored result"
+
+
+def test_other_namespace_is_not_a_hit(cache):
+    cache.store(NAMESPACE, "Show the revenue by region", "stored result")
+
+    assert cache.lookup(("iframe", "dataset", None), "Show the revenue by region") is None
+
+
+def test_hashing_embedder_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("SEMANTIC_CACHE_ENABLED", raising=False)
+    monkeypatch.delenv("SEMANTIC_CACHE_MODEL", raising=False)
+
+    assert SemanticCache.from_env() is None
+
+
+def test_hashing_embedder_can_be_enabled(monkeypatch):
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "true")
+    monkeypatch.delenv("SEMANTIC_CACHE_MODEL", raising=False)
+    monkeypatch.delenv("SEMANTIC_CACHE_THRESHOLD", raising=False)
+
+    cache = SemanticCache.from_env()
+    assert isinstance(cache.embedder, HashingEmbedder)
+    assert cache.threshold == 0.8
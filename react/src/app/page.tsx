@@ -2,6 +2,8 @@
 import React, { useState } from "react";
 import {
   fetchComponentData,
+  fetchPromptSuggestions,
+  PromptSuggestion,
   transformAndRenderComponent,
 } from "../utils/transformComponent";
 import Artifact from "@/components/Artifact";
@@ -9,6 +11,8 @@ import { toBase64 } from "@/utils/common";
 import ChatContainer from "@/components/ChatContainer";
 import Link from "next/link";
 
+const API_URL = "http://localhost:8000";
+
 export default function Home() {
   const [error, setError] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState<boolean>(false);
@@ -16,6 +20,57 @@ export default function Home() {
   const [dataset, setDataset] = useState<File | null>(null);
   const [initialStructure, setInitialStructure] = useState<boolean>(true);
 
+  // Show the prompt suggestions below the component once they are ready,
+  // a click on one of them fills the prompt
+  const renderPromptSuggestions = async (
+    componentId: string,
+    suggestionsUrl: string
+  ) => {
+    let suggestions: PromptSuggestion[] = [];
+    try {
+      suggestions = await fetchPromptSuggestions(`${API_URL}${suggestionsUrl}`);
+    } catch (err: unknown) {
+      console.error("Failed to fetch prompt suggestions", err);
+      return;
+    }
+
+    const componentDiv = document.getElementById(componentId);
+    if (!componentDiv || suggestions.length === 0) {
+      return;
+    }
+
+    const container = document.createElement("div");
+    container.className = "prompt-suggestions-container";
+
+    const title = document.createElement("h3");
+    title.className = "prompt-suggestions-title";
+    title.textContent = "Prompt suggestions";
+    container.appendChild(title);
+
+    const grid = document.createElement("div");
+    grid.className = "prompt-suggestions-grid";
+    for (const suggestion of suggestions) {
+      const item = document.createElement("div");
+      item.className = "prompt-suggestion-item";
+      item.onclick = () => setPrompt(suggestion.prompt);
+
+      const itemTitle = document.createElement("h4");
+      itemTitle.className = "item-title";
+      itemTitle.textContent = suggestion.prompt;
+      item.appendChild(itemTitle);
+
+      const itemSubtitle = document.createElement("p");
+      itemSubtitle.className = "item-subtitle";
+      itemSubtitle.textContent = suggestion.description;
+      item.appendChild(itemSubtitle);
+
+      grid.appendChild(item);
+    }
+    container.appendChild(grid);
+
+    componentDiv.insertAdjacentElement("afterend", container);
+  };
+
   const handleSubmit = async () => {
     if (!prompt.trim() || !dataset) {
       setError("Both prompt and provided dataset must be filled.");
@@ -52,7 +107,7 @@ export default function Home() {
       setIsLoading(true);
       setInitialStructure(false);
       const data = await fetchComponentData(
-        "http://localhost:8000/ui_component/generate",
+        `${API_URL}/ui_component/generate`,
         currentPrompt,
         b64Dataset as unknown as string,
         datasetName as string
@@ -82,6 +137,10 @@ export default function Home() {
       if (!result.success && result.error) {
         setError(result.error);
       }
+
+      if (data.suggestions_url) {
+        renderPromptSuggestions(componentId, data.suggestions_url);
+      }
     } catch (err: unknown) {
       let errMsg = "";
       if (err instanceof Error) {
@@ -177,20 +177,41 @@ export function transformAndRenderComponent(
   }
 }
 
+const SESSION_STORAGE_KEY = "sessionId";
+
+// The API keeps the conversation of a session, sent back with every request
+function getSessionId(): string | null {
+  return typeof window === "undefined"
+    ? null
+    : window.sessionStorage.getItem(SESSION_STORAGE_KEY);
+}
+
+function saveSessionId(response: Response) {
+  const sessionId = response.headers.get("X-Session-Id");
+  if (sessionId && typeof window !== "undefined") {
+    window.sessionStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+  }
+}
+
 export async function fetchComponentData(
   apiUrl: string,
   prompt: string,
   dataset: string,
   dataset_name: string
 ) {
+  const sessionId = getSessionId();
   const response = await fetch(apiUrl, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
+      ...(sessionId ? { "X-Session-Id": sessionId } : {}),
     },
+    credentials: "include",
     body: JSON.stringify({ prompt, dataset, dataset_name }),
   });
 
+  saveSessionId(response);
+
   if (!response.ok) {
     throw new Error(`HTTP error! status: ${response.status}`);
   }
@@ -199,3 +220,27 @@ export async function fetchComponentData(
 
   return data;
 }
+
+export interface PromptSuggestion {
+  prompt: string;
+  description: string;
+}
+
+// The suggestions are generated after the component, the request waits for them
+export async function fetchPromptSuggestions(
+  apiUrl: string
+): Promise<PromptSuggestion[]> {
+  const sessionId = getSessionId();
+  const response = await fetch(apiUrl, {
+    headers: sessionId ? { "X-Session-Id": sessionId } : {},
+    credentials: "include",
+  });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const data = await response.json();
+
+  return data.suggestions || [];
+}